@@ -15,12 +15,22 @@ Output:
   - Gantt charts of worker assignments
   - Tabular assignment report
   - Weekly summary of worked hours per employee
+  - Saved plan (.npz, SAVE_PLAN or --save) to regenerate the reports without planning again
+
+Usage:
+  python MAIN.py                      full run with the settings below
+  python MAIN.py plan|report|summary  see python MAIN.py -h
+  python MAIN.py sweep --grid max_weekly_hours=38,40,45
+                                      headcount/hours/uncovered per role and airport for each combination
 
 Dependencies:
   - pandas
   - matplotlib
   - numpy
   - tabulate
+  - pyarrow (optional: cached Arrow snapshot of the Excel inputs)
+  - pypdf (optional: merges PDF pages drawn in parallel)
+  - highspy (optional: exact solvers, SOLVER = "milp" or "colgen")
   - datetime
   - collections
 
@@ -29,21 +39,24 @@ Author: Roger Tatjé
 ─────────────────────────────────────────────────────────────────────────────
 '''
 
+import os
+
 from functions.flight_data import load_excel_data
 from functions.worker_data import load_worker_shift_rules
 from functions.builder import build_flight_objects
-from functions.shift_generation import generate_single_shifts, generate_all_shifts_9h_for_role
-from functions.assignment import assign_greedy_workers
-from functions.cluster_group import generate_fixed_cluster_shifts, find_all_valid_clusters, select_best_non_overlapping_clusters
-from functions.print_shifts import print_shifts_table, print_worker_assignments, export_assignments_to_pdf
-from functions.print_results import plot_shifts_to_pdf, plot_shifts_to_screen
-from functions.hours_summary import print_worker_hours_summary, export_worker_hours_summary_to_pdf
-
-from collections import defaultdict
+from functions.planner import run_planning, run_planning_stream
+from functions.flight_stream import stream_flight_days, StreamedFlights
+from functions.plan_store import save_plan, load_plan
+from functions.shift_cache import ShiftCache
+from functions.solvers import make_solver, SOLVERS
+from functions.instrumentation import PlanTrace
+from functions.plan_log import PlanLog, LOG_LEVELS
+# Report modules (matplotlib, PDF merge) are imported by export_reports only when a report is written
 
 # Input Files
 flight_excel_data = "Basic_Data.xlsx"
 worker_excel_data = "Workers_shift.xlsx"
+flight_stream_data = None  # CSV/JSONL schedule sorted by airport and day; if set, read day by day instead of flight_excel_data
 
 # Parámetros configurables  
 MAX_SHIFT_DURATION = 9  # hours
@@ -51,119 +64,289 @@ CLUSTER_GAP_MINUTES = 20  # minutes
 MAX_WEEKLY_HOURS = 40 # hours
 MIN_REST_HOURS_BETWEEN_SHIFTS = 12  # hours
 MAX_CONSECUTIVE_DAYS = 6 # days
+PLANNER_WORKERS = 1 # processes for independent role/airport partitions (1 = serial)
+RENDER_WORKERS = 1 # processes drawing PDF pages (1 = serial; more needs pypdf)
+SHIFT_CACHE_FILE = None # e.g. "Shift_Cache.sqlite": generated shifts per role/airport/day pattern, reused across runs (None = off)
+SHIFT_CACHE_MAX_MB = 256 # least recently used patterns are evicted above this size
+INCREMENTAL = False # re-plan only what changed since the plan saved in output_path_plan (same result as a full run)
+SOLVER = "greedy" # "greedy"; "milp": re-solve each role/airport exactly, starting from the greedy plan;
+                  # "colgen": same over shifts priced by column generation instead of every valid shift (large days)
+SOLVER_TIME_LIMIT = 60 # seconds per role/airport (milp)
+SOLVER_MIP_GAP = 0.0 # relative optimality gap at which the milp solver stops
+INSTRUMENT = False # time every stage and count the work of each role/airport/day; prints the slowest units
+TRACE_FILE = None # also write them as Chrome trace-event JSON (chrome://tracing, Perfetto), e.g. "Plan_Trace.json"
+LOG_LEVEL = "summary" # "quiet": uncovered flights only; "summary": a line per role/airport/day and totals;
+                      # "full": also the shift table of every day and the final assignment table
+LOG_JSONL = None # JSON-lines file with a record per role/airport/day and the plan totals, e.g. "Plan_Log.jsonl"
 
 # Output Parameters
 output_path_gantt_pdf = "Worker_Assignments_Gantt.pdf"
 output_path_table_pdf = "Worker_Assignments_Table.pdf"
 summary_output_pdf = "Worker_Hours_Summary.pdf"  # O cambia por input si quieres pedirlo al usuario
-
-
-
-# 1. Load flights data from excel
-df = load_excel_data(flight_excel_data)
-
-# 2. Load rules for each role and operation type
-worker_rules = load_worker_shift_rules(worker_excel_data)
-
-# 3. Build flight objects with time windows for each applicable role
-flights = build_flight_objects(df, worker_rules)
-
-# Get unique airports
-unique_airports = sorted({f["airport"] for f in flights})
-# print("Unique airports detected:", unique_airports)
-
-# Get roles
-roles_in_data = list(worker_rules.keys())
-# print("Detected roles:", roles_in_data)
-
-# Initialize global lists and tracking structures
-all_shifts = []
-all_assignments = []
-existing_workers = set()                 # Set of already created worker IDs
-hour_counter = defaultdict(float)        # Tracks worked hours per worker per natural week
-last_shift_end_time = {}                 # Last shift end time per worker
-streak_tracker = {}                      # Tracks streaks of consecutive working days per worker
-
-
-# 4) For each role
-for role in roles_in_data:
-    # 5) For each airport
-    for airport in unique_airports:
-        # Get all single shifts for this role at this airport
-        shifts_this_role_airport = generate_single_shifts(flights, role_filter=role, airport_filter=airport)
-
-        # Get days
-        days_in_airport = sorted({s["departure"].date() for s in shifts_this_role_airport})
-        # 6) For each day for role and airport
-        for day in days_in_airport:
-            # Filters current day
-            shifts_this_day = [s for s in shifts_this_role_airport if s["departure"].date() == day] # 
-            cluster_blocks = [] 
-            cluster_flight_ids = set() 
-
-            # 7) Identify clusters
-            if role in {"SPV PAX", "CHECKIN", "SPV RAMP", "DRIV"}:
-                # Find candidate clusters
-                all_candidate_clusters = find_all_valid_clusters(shifts_this_day, role, CLUSTER_GAP_MINUTES)
-                # Select the best non-overlapping clusters
-                clusters = select_best_non_overlapping_clusters(all_candidate_clusters)
-                # For each cluster
-                for cluster in clusters:
-                    # Generate shifts
-                    bloques = generate_fixed_cluster_shifts(cluster)
-                    cluster_blocks.extend(bloques)
-                    # Flights already covered
-                    for bloque in bloques:
-                        cluster_flight_ids.update(f["flight_id"] for f in bloque["flights"])
-
-            # 8) Remaining shifts
-            remaining_shifts = [s for s in shifts_this_day if s["flight_id"] not in cluster_flight_ids]
-
-            # Combine
-            inputs_for_generation = cluster_blocks + remaining_shifts
-
-            # 9) Generate all valid pairings
-            all_shifts_that_day = generate_all_shifts_9h_for_role(inputs_for_generation, max_duration_hours=MAX_SHIFT_DURATION, min_separation=CLUSTER_GAP_MINUTES)
-
-            # 10) Assign workers greedy
-            print(f"Task {role}, Airport {airport}, Day {day}")
-            print_shifts_table(all_shifts_that_day)
-
-            all_shifts.extend(all_shifts_that_day) # All shifts (across all roles, days, and airports)
-
-            assignments, not_covered = assign_greedy_workers(
-                    all_shifts_that_day,
-                    flights,
-                    MAX_WEEKLY_HOURS,
-                    existing_workers,
-                    hour_counter,
-                    MIN_REST_HOURS_BETWEEN_SHIFTS,
-                    last_shift_end_time,
-                    MAX_CONSECUTIVE_DAYS,          
-                    streak_tracker                 
+output_path_plan = "Worker_Plan.npz"  # Full plan, to regenerate the reports without planning again (MAIN.py report --plan)
+SAVE_PLAN = False # write output_path_plan after planning (always with INCREMENTAL, which re-plans against it)
+REPORT_FORMAT = "pdf" # table and hours reports: "pdf" (matplotlib), "html" or "csv" (written directly, same names with that extension)
+
+PARAM_NAMES = ("max_shift_duration", "cluster_gap_minutes", "max_weekly_hours", "min_rest_hours_between_shifts",
+               "max_consecutive_days")
+
+
+def plan_schedule(flight_data, worker_data, params, stream=False, planner_workers=1, on_unit=None, shift_cache=None,
+                  previous=None, solver=None, trace=None):
+    """
+    Steps 1-10: loads the inputs and plans every role, airport and day.
+    on_unit(role, airport, day, shifts, not_covered) is called for each unit (e.g. PlanLog.unit).
+    flight_data is an Excel file, or a CSV/JSONL schedule sorted by airport and day if stream.
+    shift_cache: optional ShiftCache reusing the shifts generated for repeated days.
+    previous: a saved plan (load_plan) to re-plan incrementally (Excel input only).
+    solver: e.g. make_solver("milp"), applied after the greedy assignment (Excel input only).
+    trace: optional PlanTrace, filled with the stage times and counters of every unit.
+    Returns (plan, flights), see run_planning; in stream mode flights re-reads the file each time it is iterated.
+    """
+    # 1. Load rules for each role and operation type
+    worker_rules = load_worker_shift_rules(worker_data)
+
+    # Get roles
+    roles_in_data = list(worker_rules.keys())
+    # print("Detected roles:", roles_in_data)
+
+    if stream:
+        # 2-10) Read one airport/day at a time and plan it (clusters, valid pairings, greedy assignment)
+        plan = run_planning_stream(stream_flight_days(flight_data, worker_rules), roles_in_data, params, on_unit=on_unit, shift_cache=shift_cache,
+                                   trace=trace)
+        # Flights for the Gantt and the saved plan are read again from the stream
+        flights = StreamedFlights(flight_data, worker_rules)
+    else:
+        # 2. Load flights data from excel
+        df = load_excel_data(flight_data)
+
+        # 3. Build flight objects with time windows for each applicable role
+        flights = build_flight_objects(df, worker_rules)
+
+        # 4-10) For each role, airport and day: clusters, valid pairings and greedy assignment
+        plan = run_planning(flights, roles_in_data, params, workers=planner_workers, on_unit=on_unit,
+                            shift_cache=shift_cache, previous=previous, solver=solver, trace=trace)
+    return plan, flights
+
+
+def sweep_schedule(flight_data, worker_data, base_params, grid, workers=1, solver=None):
+    """
+    Plans every combination of the parameter grid ({name: [values]}) on the same flights,
+    sharing the work that does not depend on the swept parameters (see run_sweep).
+    Returns the run_sweep results.
+    """
+    from functions.sweep import run_sweep
+
+    worker_rules = load_worker_shift_rules(worker_data)
+    df = load_excel_data(flight_data)
+    flights = build_flight_objects(df, worker_rules)
+    return run_sweep(flights, list(worker_rules.keys()), base_params, grid, workers=workers, solver=solver)
+
+
+def parse_grid(specs):
+    """
+    Grid from "name=v1,v2,..." strings; names are the planning params.
+    """
+    grid = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        name = name.strip().replace("-", "_")
+        if name not in PARAM_NAMES or not values:
+            raise ValueError(f"Invalid grid '{spec}': expected name=v1,v2 with name in {', '.join(PARAM_NAMES)}")
+        grid[name] = [int(v) if v.strip().lstrip("-").isdigit() else float(v) for v in values.split(",")]
+    return grid
+
+
+def report_trace(trace, trace_path=None, top=20):
+    """
+    Prints the slowest units of a traced run and writes the Chrome trace, if a path is given.
+    """
+    trace.print_summary(top)
+    if trace_path:
+        trace.export_chrome_trace(trace_path)
+
+
+def export_reports(plan, flights, gantt_path, table_path, summary_path, report_format="pdf", render_workers=1):
+    """
+    Exports the Gantt (PDF) and the assignment table and hours summary (PDF, HTML or CSV).
+    """
+    from functions.print_results import plot_shifts_to_pdf
+
+    all_assignments = plan["all_assignments"]
+    hour_counter = plan["hour_counter"]
+
+    # Export to PDF
+    plot_shifts_to_pdf(all_assignments, flights, gantt_path, workers=render_workers) # Gantt
+    if report_format == "pdf":
+        from functions.print_shifts import export_assignments_to_pdf
+        from functions.hours_summary import export_worker_hours_summary_to_pdf
+        export_assignments_to_pdf(all_assignments, table_path, workers=render_workers) # Table
+        export_worker_hours_summary_to_pdf(hour_counter, output_path=summary_path, workers=render_workers) # Hours summary
+    else:
+        from functions.report_tables import export_assignments_report, export_worker_hours_report
+        export_assignments_report(all_assignments, table_path, report_format) # Table
+        export_worker_hours_report(hour_counter, summary_path, report_format) # Hours summary
+
+
+def main():
+    params = {
+        "max_shift_duration": MAX_SHIFT_DURATION,
+        "cluster_gap_minutes": CLUSTER_GAP_MINUTES,
+        "max_weekly_hours": MAX_WEEKLY_HOURS,
+        "min_rest_hours_between_shifts": MIN_REST_HOURS_BETWEEN_SHIFTS,
+        "max_consecutive_days": MAX_CONSECUTIVE_DAYS,
+    }
+
+    trace = PlanTrace() if INSTRUMENT or TRACE_FILE else None
+    with PlanLog(LOG_LEVEL, LOG_JSONL) as log:
+        plan, flights = plan_schedule(
+            flight_stream_data or flight_excel_data, worker_excel_data, params,
+            stream=bool(flight_stream_data), planner_workers=PLANNER_WORKERS, on_unit=log.unit,
+            shift_cache=ShiftCache(SHIFT_CACHE_FILE, SHIFT_CACHE_MAX_MB * 1024 * 1024) if SHIFT_CACHE_FILE else None,
+            previous=load_plan(output_path_plan) if INCREMENTAL and os.path.exists(output_path_plan) else None,
+            solver=make_solver(SOLVER, time_limit=SOLVER_TIME_LIMIT, mip_gap=SOLVER_MIP_GAP) if SOLVER != "greedy" else None,
+            trace=trace
+        )
+        if SAVE_PLAN or INCREMENTAL:
+            save_plan(plan, flights, output_path_plan)
+        log.plan(plan)
+    if trace:
+        report_trace(trace, TRACE_FILE)
+    export_reports(plan, flights, output_path_gantt_pdf, output_path_table_pdf, summary_output_pdf,
+                   report_format=REPORT_FORMAT, render_workers=RENDER_WORKERS)
+    return plan
+
+
+def cli(argv=None):
+    """
+    Command line entry point. Without a subcommand it runs main() with the settings above.
+
+        python MAIN.py plan    [options]   plan and print the totals (assignment tables with --log-level full)
+        python MAIN.py report  [options]   plan and export the Gantt, table and hours reports
+        python MAIN.py summary [options]   plan and print the weekly hours per worker
+        python MAIN.py sweep   [options]   plan a grid of parameter values (--grid name=v1,v2)
+
+    Options default to the constants of this file; see python MAIN.py <subcommand> -h.
+    Planning runs can save the plan (--save); report and summary can load one (--plan) instead of planning.
+    """
+    import argparse
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--flights", default=flight_excel_data, help="flight schedule (Excel)")
+    common.add_argument("--stream", metavar="FILE", default=flight_stream_data,
+                        help="CSV/JSONL schedule sorted by airport and day, read day by day instead of --flights")
+    common.add_argument("--workers-rules", default=worker_excel_data, help="shift rules per role (Excel)")
+    common.add_argument("--max-shift-duration", type=float, default=MAX_SHIFT_DURATION, help="hours")
+    common.add_argument("--cluster-gap-minutes", type=float, default=CLUSTER_GAP_MINUTES, help="minutes")
+    common.add_argument("--max-weekly-hours", type=float, default=MAX_WEEKLY_HOURS, help="hours")
+    common.add_argument("--min-rest-hours", type=float, default=MIN_REST_HOURS_BETWEEN_SHIFTS, help="hours between shifts")
+    common.add_argument("--max-consecutive-days", type=int, default=MAX_CONSECUTIVE_DAYS, help="days")
+    common.add_argument("--planner-workers", type=int, default=PLANNER_WORKERS, help="planning processes (1 = serial)")
+    common.add_argument("--shift-cache", metavar="FILE", default=SHIFT_CACHE_FILE,
+                        help="cache generated shifts per day pattern in this file (SQLite), reused across runs")
+    common.add_argument("--previous", metavar="FILE",
+                        help="saved plan to re-plan incrementally against (only changed days are planned again)")
+    common.add_argument("--shift-cache-mb", type=float, default=SHIFT_CACHE_MAX_MB, help="cache size limit (MB)")
+    common.add_argument("--solver", choices=list(SOLVERS), default=SOLVER,
+                        help="assignment solver (milp re-solves each role/airport exactly; colgen also prices shifts "
+                             "instead of generating all; both need highspy)")
+    common.add_argument("--time-limit", type=float, default=SOLVER_TIME_LIMIT, help="milp seconds per role/airport")
+    common.add_argument("--mip-gap", type=float, default=SOLVER_MIP_GAP, help="milp relative optimality gap")
+    common.add_argument("--instrument", action="store_true", default=INSTRUMENT,
+                        help="time every stage and count the work of each role/airport/day, print the slowest units")
+    common.add_argument("--trace", metavar="FILE", default=TRACE_FILE,
+                        help="write the stage times as Chrome trace-event JSON (implies --instrument)")
+    common.add_argument("--log-level", choices=LOG_LEVELS, default=LOG_LEVEL,
+                        help="quiet: uncovered flights only; summary: a line per role/airport/day and totals; "
+                             "full: also the shift and assignment tables")
+    common.add_argument("--quiet", dest="log_level", action="store_const", const="quiet", help="same as --log-level quiet")
+    common.add_argument("--log-jsonl", metavar="FILE", default=LOG_JSONL,
+                        help="write a JSON line per role/airport/day and for the plan totals")
+    common.add_argument("--save", metavar="FILE", default=output_path_plan if SAVE_PLAN else "",
+                        help="save the plan to this file (.npz), e.g. for report --plan or --previous")
+    saved = argparse.ArgumentParser(add_help=False)
+    saved.add_argument("--plan", metavar="FILE", help="load a saved plan instead of planning")
+
+    parser = argparse.ArgumentParser(description="Airport ground handling shift planning")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("plan", parents=[common], help="plan and print the totals (and tables, --log-level full)")
+    report = commands.add_parser("report", parents=[common, saved], help="plan and export the reports")
+    report.add_argument("--gantt", default=output_path_gantt_pdf, help="Gantt PDF")
+    report.add_argument("--table", default=output_path_table_pdf, help="assignment table")
+    report.add_argument("--summary", default=summary_output_pdf, help="weekly hours summary")
+    report.add_argument("--format", choices=["pdf", "html", "csv"], default=REPORT_FORMAT,
+                        help="format of the table and hours reports (the Gantt is always PDF)")
+    report.add_argument("--render-workers", type=int, default=RENDER_WORKERS, help="processes drawing PDF pages")
+    commands.add_parser("summary", parents=[common, saved], help="plan and print the weekly hours per worker")
+    sweep = commands.add_parser("sweep", parents=[common], help="plan a grid of parameter values and compare them")
+    sweep.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                       help=f"values of a planning parameter (repeatable): {', '.join(PARAM_NAMES)}")
+    sweep.add_argument("--sweep-workers", type=int, default=PLANNER_WORKERS, help="processes running the sweep")
+    sweep.add_argument("--output", metavar="FILE", help="also write the metrics to a CSV file")
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        return main()
+
+    params = {
+        "max_shift_duration": args.max_shift_duration,
+        "cluster_gap_minutes": args.cluster_gap_minutes,
+        "max_weekly_hours": args.max_weekly_hours,
+        "min_rest_hours_between_shifts": args.min_rest_hours,
+        "max_consecutive_days": args.max_consecutive_days,
+    }
+
+    solver = make_solver(args.solver, time_limit=args.time_limit, mip_gap=args.mip_gap) if args.solver != "greedy" else None
+    if args.stream and solver:
+        parser.error(f"the {args.solver} solver needs the Excel schedule (--flights), not --stream")
+
+    if args.command == "sweep":
+        from functions.sweep import print_sweep_matrix, export_sweep_csv
+        try:
+            grid = parse_grid(args.grid)
+        except ValueError as e:
+            parser.error(str(e))
+        if not grid:
+            parser.error("sweep needs at least one --grid")
+        if args.stream:
+            parser.error("sweep reads the Excel schedule (--flights), not --stream")
+        results = sweep_schedule(args.flights, args.workers_rules, params, grid, workers=args.sweep_workers, solver=solver)
+        print_sweep_matrix(results, grid)
+        if args.output:
+            export_sweep_csv(results, grid, args.output)
+        return results
+
+    with PlanLog(args.log_level, args.log_jsonl) as log:
+        if getattr(args, "plan", None):
+            plan = load_plan(args.plan)
+            flights = plan["flights"]
+        else:
+            trace = PlanTrace() if args.instrument or args.trace else None
+            plan, flights = plan_schedule(
+                args.stream or args.flights, args.workers_rules, params,
+                stream=bool(args.stream), planner_workers=args.planner_workers,
+                on_unit=log.unit,
+                shift_cache=ShiftCache(args.shift_cache, int(args.shift_cache_mb * 1024 * 1024)) if args.shift_cache else None,
+                previous=load_plan(args.previous) if args.previous else None,
+                solver=solver,
+                trace=trace
             )
-            all_assignments.extend(assignments)
-
-            if not_covered:
-                print(f"WARNING: {len(not_covered)} flight(s) not covered: {sorted(not_covered)}")
-
-# 11) Summary shift generation and assignments
-print(f"Total shifts generated across all roles: {len(all_shifts)}")
-print(f"Total workers assigned: {len(all_assignments)}")
-
-# 12) Print final assignments (screen)
-print("=== Final assignment table ===")
-print_worker_assignments(all_assignments)
-# plot_shifts_to_screen(all_assignments, flights) # Gantt
-# print_worker_hours_summary(hour_counter) # Screen
-
-
-# Export to PDF
-plot_shifts_to_pdf(all_assignments, flights, output_path_gantt_pdf) # Gantt
-export_assignments_to_pdf(all_assignments, output_path_table_pdf) # Table
-export_worker_hours_summary_to_pdf(hour_counter, output_path=summary_output_pdf) # Hours summary
-
-
-
-
-
+            if args.save:
+                save_plan(plan, flights, args.save)
+            if trace:
+                report_trace(trace, args.trace)
+            log.plan(plan)
+
+        if args.command == "report":
+            if args.plan:
+                print(f"Total workers assigned: {len(plan['all_assignments'])}")
+            export_reports(plan, flights, args.gantt, args.table, args.summary,
+                           report_format=args.format, render_workers=args.render_workers)
+        elif args.command == "summary":
+            from functions.hours_summary import print_worker_hours_summary
+            print_worker_hours_summary(plan["hour_counter"])
+    return plan
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,3 @@
+"""
+Benchmarks of the planning pipeline on synthetic schedules (see benchmarks.run).
+"""
@@ -0,0 +1,349 @@
+'''
+Benchmark of the planning pipeline on a synthetic schedule.
+
+Times every stage separately and, unless --no-memory, measures its peak memory
+with tracemalloc in a second run: load_excel_data, build_flight_objects,
+partition_single_shifts, run_planning (the planner itself, with its per-unit stages
+cluster, generate, assign, ... from a PlanTrace) and each PDF exporter. Results are
+written to JSON so runs of different commits can be compared (--compare).
+
+Usage (from the repository root):
+  python -m benchmarks.run --airports 2 --days 7 --flights-per-day 20 --output bench.json
+  python -m benchmarks.run --output bench_new.json --compare bench.json
+'''
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_schedule, DEFAULT_OPERATION_MIX
+from functions.flight_data import load_excel_data
+from functions.worker_data import load_worker_shift_rules
+from functions.builder import build_flight_objects
+from functions.shift_generation import partition_single_shifts
+from functions.planner import run_planning
+from functions.shift_cache import ShiftCache
+from functions.solvers import make_solver, SOLVERS
+from functions.instrumentation import PlanTrace, TRACE_COUNTERS
+from MAIN import (MAX_SHIFT_DURATION, CLUSTER_GAP_MINUTES, MAX_WEEKLY_HOURS, MIN_REST_HOURS_BETWEEN_SHIFTS,
+                  MAX_CONSECUTIVE_DAYS, SOLVER_TIME_LIMIT, SOLVER_MIP_GAP, worker_excel_data)
+
+# Stages in pipeline order
+STAGES = (
+    "load_excel_data",
+    "build_flight_objects",
+    "partition_single_shifts",
+    "run_planning",
+    "run_planning_incremental",
+    "plot_shifts_to_pdf",
+    "export_assignments_to_pdf",
+    "export_worker_hours_summary_to_pdf",
+)
+
+
+class StageTimer:
+    """
+    Accumulates, per stage, wall time, number of calls and peak memory allocated
+    during a call (above what was allocated when it started; tracemalloc, if memory).
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stats = {name: {"seconds": 0.0, "calls": 0, "peak_mb": 0.0} for name in STAGES}
+
+    @contextmanager
+    def stage(self, name, trace=None):
+        """
+        Times the block as stage name. trace: PlanTrace of the block, if it records
+        memory (its stages reset the tracemalloc peak, see PlanTrace).
+        """
+        if self.memory:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if trace is not None:
+                trace.peak_bytes = 0
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+        stats = self.stats[name]
+        stats["seconds"] += elapsed
+        stats["calls"] += 1
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            if trace is not None:
+                peak = max(peak, trace.peak_bytes)
+            stats["peak_mb"] = max(stats["peak_mb"], round((peak - current) / 2**20, 3))
+
+    def run(self, name, function, *args, **kwargs):
+        with self.stage(name):
+            return function(*args, **kwargs)
+
+
+def run_benchmark(schedule_options, params, worker_rules_path=worker_excel_data, output_dir=None, memory=True, pdf=True,
+                  solver="greedy", shift_cache=None, planner_workers=1, incremental=False):
+    """
+    Writes a synthetic schedule (see generate_schedule) to Excel and runs the pipeline on
+    it stage by stage (see run_stages). Times come from a plain run; with memory, a second
+    run under tracemalloc (several times slower) gives the peak memory of each stage.
+    PDFs go to output_dir (a temporary directory if not given).
+    solver, shift_cache, planner_workers, incremental: see run_stages.
+    Returns the result dictionary written as JSON.
+    """
+    worker_rules = load_worker_shift_rules(worker_rules_path)
+    settings = {"pdf": pdf, "solver": solver, "shift_cache": bool(shift_cache), "planner_workers": planner_workers,
+                "incremental": incremental}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        schedule_path = os.path.join(tmp, "schedule.xlsx")
+        generate_schedule(**schedule_options).to_excel(schedule_path, index=False)
+        options = dict(pdf=pdf, solver=solver, shift_cache=shift_cache, planner_workers=planner_workers,
+                       incremental=incremental)
+
+        timer = StageTimer()
+        trace = PlanTrace()
+        counts = run_stages(timer, trace, schedule_path, worker_rules, params, output_dir or tmp, **options)
+        planning = trace.stage_stats()
+        if memory:
+            traced, traced_trace = StageTimer(memory=True), PlanTrace(memory=True)
+            tracemalloc.start()
+            try:
+                run_stages(traced, traced_trace, schedule_path, worker_rules, params, output_dir or tmp, **options)
+            finally:
+                tracemalloc.stop()
+            for name, stats in timer.stats.items():
+                stats["peak_mb"] = traced.stats[name]["peak_mb"]
+            for name, stats in traced_trace.stage_stats().items():
+                if name in planning:
+                    planning[name]["peak_mb"] = round(stats["peak_mb"], 3)
+
+    for stats in list(timer.stats.values()) + list(planning.values()):
+        stats["seconds"] = round(stats["seconds"], 6)
+    _, counters = trace.totals()
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "schedule": {k: (list(v) if isinstance(v, tuple) else v) for k, v in schedule_options.items()},
+        "params": params,
+        "settings": settings,
+        "memory_profiled": memory,
+        "stages": timer.stats,
+        "planning_stages": planning,
+        "total_seconds": round(sum(stats["seconds"] for stats in timer.stats.values()), 6),
+        "counts": counts,
+        "counters": {name: counters[name] for name in TRACE_COUNTERS},
+    }
+
+
+def run_stages(timer, trace, schedule_path, worker_rules, params, output_dir, pdf=True, solver="greedy",
+               shift_cache=None, planner_workers=1, incremental=False):
+    """
+    Runs the pipeline on a flight workbook, every stage through timer; the planner is
+    run_planning, traced by trace (stage times and counters of every unit).
+    solver: name in SOLVERS; shift_cache: ShiftCache file (the memory run finds it filled
+    by the timed run); planner_workers: planning processes (their memory is not traced);
+    incremental: also re-plan the same schedule against the first plan (every unit replayed).
+    Returns counts of flights, units, shifts (and dominated shifts pruned), assignments,
+    workers and uncovered flights.
+    """
+    from functions.print_results import plot_shifts_to_pdf
+    from functions.print_shifts import export_assignments_to_pdf
+    from functions.hours_summary import export_worker_hours_summary_to_pdf
+
+    df = timer.run("load_excel_data", load_excel_data, schedule_path, use_cache=False)
+    flights = timer.run("build_flight_objects", build_flight_objects, df, worker_rules)
+    buckets = timer.run("partition_single_shifts", partition_single_shifts, flights)
+
+    uncovered = []
+    options = dict(
+        workers=planner_workers, buckets=buckets, trace=trace,
+        shift_cache=ShiftCache(shift_cache) if shift_cache else None,
+        solver=make_solver(solver, time_limit=SOLVER_TIME_LIMIT, mip_gap=SOLVER_MIP_GAP) if solver != "greedy" else None,
+    )
+    with timer.stage("run_planning", trace):
+        plan = run_planning(flights, list(worker_rules), params,
+                            on_unit=lambda role, airport, day, shifts, not_covered: uncovered.append(len(not_covered)),
+                            **options)
+    if incremental:
+        with timer.stage("run_planning_incremental", trace):
+            run_planning(flights, list(worker_rules), params, previous=plan, **options)
+
+    assignments = plan["all_assignments"]
+    if pdf:
+        timer.run("plot_shifts_to_pdf", plot_shifts_to_pdf, assignments, flights,
+                  os.path.join(output_dir, "bench_gantt.pdf"))
+        timer.run("export_assignments_to_pdf", export_assignments_to_pdf, assignments,
+                  os.path.join(output_dir, "bench_table.pdf"))
+        timer.run("export_worker_hours_summary_to_pdf", export_worker_hours_summary_to_pdf, plan["hour_counter"],
+                  os.path.join(output_dir, "bench_hours.pdf"))
+
+    return {
+        "flights": len(flights),
+        "units": len(plan["units"]),
+        "shifts": plan["shift_count"],
+        "pruned_shifts": plan["pruned_shifts"],
+        "assignments": len(assignments),
+        "workers": len({a["worker_id"] for a in assignments}),
+        "uncovered": sum(uncovered),
+    }
+
+
+def environment():
+    """
+    Interpreter, library versions and git commit of the run.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "commit": commit,
+    }
+
+
+def print_stages(result):
+    """
+    Prints the time, calls and peak memory of every stage, then of the planner stages.
+    """
+    from tabulate import tabulate
+
+    for title, stages in (("Stage", result["stages"]), ("Planner stage", result.get("planning_stages", {}))):
+        rows = [
+            {title: name, "Seconds": stats["seconds"], "Calls": stats["calls"], "Peak (MB)": stats["peak_mb"]}
+            for name, stats in stages.items() if stats["calls"]
+        ]
+        print(tabulate(rows, headers="keys", tablefmt="fancy_grid", stralign="center"))
+    print(f"Total: {result['total_seconds']} s, counts: {result['counts']}")
+
+
+def compare(current, baseline):
+    """
+    Prints the time of every stage in both results and their ratio (current / baseline),
+    then the same for the planner stages. Stages not run in both (e.g. PDFs with --no-pdf)
+    show n/a and are left out of the total. Warns if the runs had a different schedule,
+    params or settings, as their times are then not comparable.
+    """
+    from tabulate import tabulate
+
+    different = [key for key in ("schedule", "params", "settings") if current.get(key) != baseline.get(key)]
+    if different:
+        print(f"WARNING: the runs differ in {', '.join(different)}; ratios compare different work")
+
+    print(f"Baseline: {baseline['environment'].get('commit')}  Current: {current['environment'].get('commit')}")
+    for title, key in (("Stage", "stages"), ("Planner stage", "planning_stages")):
+        rows = []
+        total_before = total_after = 0.0
+        names = list(current.get(key, {})) + [n for n in baseline.get(key, {}) if n not in current.get(key, {})]
+        for name in names:
+            before = baseline.get(key, {}).get(name, {})
+            after = current.get(key, {}).get(name, {})
+            if before.get("calls") and after.get("calls"):
+                total_before += before["seconds"]
+                total_after += after["seconds"]
+                ratio = round(after["seconds"] / before["seconds"], 2) if before["seconds"] else "n/a"
+            elif before.get("calls") or after.get("calls"):
+                ratio = "n/a"
+            else:
+                continue
+            rows.append({
+                title: name,
+                "Baseline (s)": before["seconds"] if before.get("calls") else "n/a",
+                "Current (s)": after["seconds"] if after.get("calls") else "n/a",
+                "Ratio": ratio,
+            })
+        if key == "stages":
+            rows.append({
+                title: "total (stages run in both)",
+                "Baseline (s)": round(total_before, 6),
+                "Current (s)": round(total_after, 6),
+                "Ratio": round(total_after / total_before, 2) if total_before else "n/a",
+            })
+        if rows:
+            print(tabulate(rows, headers="keys", tablefmt="fancy_grid", stralign="center"))
+
+
+def parse_mix(text):
+    """
+    Operation mix from "Arr/Dep=0.6,Dep=0.3,Arr=0.1".
+    """
+    mix = {}
+    for part in text.split(","):
+        op, _, weight = part.partition("=")
+        mix[op.strip()] = float(weight)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the planning pipeline on a synthetic schedule")
+    parser.add_argument("--airports", type=int, default=1, help="number of airports")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--flights-per-day", type=int, default=20, help="per airport")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_OPERATION_MIX,
+                        help="operation type weights, e.g. Arr/Dep=0.6,Dep=0.3,Arr=0.1")
+    parser.add_argument("--clustering", type=float, default=0.5, help="share of flights departing in banks (0-1)")
+    parser.add_argument("--bank-gap", type=int, default=10, help="max minutes between departures of a bank")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers-rules", default=worker_excel_data, help="shift rules per role (Excel)")
+    parser.add_argument("--no-memory", action="store_true", help="time only (skips the tracemalloc run)")
+    parser.add_argument("--no-pdf", action="store_true", help="skip the PDF exporters")
+    parser.add_argument("--pdf-dir", help="keep the PDFs in this directory")
+    parser.add_argument("--solver", choices=list(SOLVERS), default="greedy", help="assignment solver (milp, colgen need highspy)")
+    parser.add_argument("--shift-cache", metavar="FILE", help="shift cache file (SQLite); an existing file benchmarks a warm cache")
+    parser.add_argument("--planner-workers", type=int, default=1,
+                        help="planning processes (their memory is not traced)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="also re-plan the same schedule against the first plan (every unit replayed)")
+    parser.add_argument("--output", default="benchmark.json", help="JSON results")
+    parser.add_argument("--compare", metavar="FILE", help="previous JSON results to compare with")
+    args = parser.parse_args(argv)
+
+    schedule_options = {
+        "airports": args.airports,
+        "days": args.days,
+        "flights_per_day": args.flights_per_day,
+        "operation_mix": args.mix,
+        "clustering": args.clustering,
+        "bank_gap_minutes": args.bank_gap,
+        "seed": args.seed,
+    }
+    params = {
+        "max_shift_duration": MAX_SHIFT_DURATION,
+        "cluster_gap_minutes": CLUSTER_GAP_MINUTES,
+        "max_weekly_hours": MAX_WEEKLY_HOURS,
+        "min_rest_hours_between_shifts": MIN_REST_HOURS_BETWEEN_SHIFTS,
+        "max_consecutive_days": MAX_CONSECUTIVE_DAYS,
+    }
+    result = run_benchmark(schedule_options, params, args.workers_rules, args.pdf_dir,
+                           memory=not args.no_memory, pdf=not args.no_pdf, solver=args.solver,
+                           shift_cache=args.shift_cache, planner_workers=args.planner_workers,
+                           incremental=args.incremental)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print_stages(result)
+    print(f"Benchmark results written to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(result, json.load(f))
+    return result
+
+
+if __name__ == "__main__":
+    main()
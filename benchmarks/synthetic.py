@@ -0,0 +1,70 @@
+import random
+from datetime import date, timedelta
+
+import pandas as pd
+
+# Operation types of Workers_shift.xlsx and their default share of the flights
+DEFAULT_OPERATION_MIX = {"Arr/Dep": 0.6, "Dep": 0.3, "Arr": 0.1}
+
+
+def generate_schedule(airports=("BCN",), days=7, flights_per_day=20, operation_mix=None, clustering=0.5,
+                      bank_gap_minutes=10, first_day=date(2025, 4, 1), first_hour=5, last_hour=23, seed=0):
+    """
+    Synthetic flight schedule in the layout of the flight workbooks (ID, Airport,
+    Operation Type, Time, Day), one row per flight, sorted by airport, day and time.
+
+    - airports: airport codes, or a number of airports (A00, A01, ...)
+    - days / flights_per_day: schedule size, per airport
+    - operation_mix: {operation type: weight}, DEFAULT_OPERATION_MIX if not given
+    - clustering: share of the flights (0 to 1) departing in banks, one after another
+      within bank_gap_minutes, so they form clusters (find_all_valid_clusters);
+      the rest depart at uniformly random times between first_hour and last_hour
+    - seed: same arguments and seed give the same schedule
+    """
+    if isinstance(airports, int):
+        airports = [f"A{i:02d}" for i in range(airports)]
+    mix = operation_mix or DEFAULT_OPERATION_MIX
+    operation_types = list(mix)
+    weights = [mix[op] for op in operation_types]
+    rng = random.Random(seed)
+
+    rows = []
+    number = 1000
+    span = (last_hour - first_hour) * 60
+    for airport in airports:
+        for d in range(days):
+            day = first_day + timedelta(days=d)
+            minutes = []
+            banked = round(flights_per_day * clustering)
+
+            # Banks: runs of 2 to 6 flights departing close to each other
+            while len(minutes) < banked:
+                size = min(rng.randint(2, 6), banked - len(minutes))
+                t = rng.randrange(0, span)
+                for _ in range(size):
+                    minutes.append(min(t, span - 1))
+                    t += rng.randint(1, max(1, bank_gap_minutes))
+            minutes += [rng.randrange(0, span) for _ in range(flights_per_day - banked)]
+
+            for m in sorted(minutes):
+                number += 1
+                hour, minute = divmod(first_hour * 60 + m, 60)
+                rows.append({
+                    "ID": f"FLT{number}",
+                    "Airport": airport,
+                    "Operation Type": rng.choices(operation_types, weights)[0],
+                    "Time": f"{hour:02d}:{minute:02d}:00",
+                    "Day": pd.Timestamp(day),
+                })
+
+    return pd.DataFrame(rows, columns=["ID", "Airport", "Operation Type", "Time", "Day"])
+
+
+def write_schedule(output_path, **options):
+    """
+    Writes a synthetic schedule (see generate_schedule) to an Excel workbook that
+    load_excel_data can read. Returns the DataFrame.
+    """
+    df = generate_schedule(**options)
+    df.to_excel(output_path, index=False)
+    return df
@@ -1,6 +1,21 @@
+import heapq
 from collections import defaultdict
-from datetime import timedelta, date
 
+from functions.worker_pool import WorkerPool
+
+
+# Prefixes used to build worker IDs by role
+ROLE_PREFIX = {
+    "SPV PAX": "SP",  "CHECKIN": "CH", "AG PAX": "AP", "COORDI": "CO",
+    "SPV RAMP": "SR", "DRIV": "DR",   "OPE_A": "OA",  "OPE_B": "OB",
+}
+
+
+def worker_prefix(role):
+    """
+    Returns the worker ID prefix of a role, e.g. 'SP' for 'SPV PAX'.
+    """
+    return ROLE_PREFIX.get(role, role[:2].upper())
 
 
 # Assignment
@@ -14,150 +29,138 @@ def assign_greedy_workers(
     last_shift_end_time=None,
     max_consecutive_days=6,
     streak_tracker=None,
+    coverage_scope=None,
+    worker_pool=None,
+    stats=None,
 ):
     """
     Greedy shift assignment algorithm:
     - Assigns workers to cover all flights using shifts
+    - Only the flight IDs in coverage_scope must be covered (e.g. the flights of one
+      role/airport/day); all flights if not provided
     - Respects constraints:
         • ≤ max_weekly_hours per natural week
         • ≥ min_rest_hours_between_shifts between two shifts
         • ≤ max_consecutive_days worked in a row (not natural week)
     - Reuses existing workers when possible; creates new ones otherwise
+    - worker_pool (WorkerPool) indexes the worker state across calls; if not
+      provided, one is built from existing_workers, hour_counter, ...
+    - stats: optional dict, gets the greedy iterations (shifts assigned), the worker
+      eligibility checks and the workers scanned by them
     """
 
-    # Prefixes used to build worker IDs by role
-    role_prefix = {
-        "SPV PAX": "SP",  "CHECKIN": "CH", "AG PAX": "AP", "COORDI": "CO",
-        "SPV RAMP": "SR", "DRIV": "DR",   "OPE_A": "OA",  "OPE_B": "OB",
-    }
-
-    # Initialize persistent structures if not provided
-    if existing_workers is None:
-        existing_workers = set()
-    if hour_counter is None: # Hours worked per worker
-        hour_counter = defaultdict(float)  
-    if last_shift_end_time is None: # End time last shift
-        last_shift_end_time = {} 
-    if streak_tracker is None: # How many days in a row has worked
-        streak_tracker = {} 
+    # Indexed worker state; built around the given structures if not provided
+    if worker_pool is None:
+        worker_pool = WorkerPool(existing_workers, hour_counter, last_shift_end_time, streak_tracker)
+    pool_counts = (worker_pool.eligibility_checks, worker_pool.workers_scanned)
 
     # No worker assigned to 2 shifts in the same day
     assigned_day = defaultdict(set) 
 
     # Set of all flights that must be covered
-    all_flights = {f["id"] for f in flights}
+    if coverage_scope is not None:
+        all_flights = set(coverage_scope)
+    else:
+        all_flights = {f["id"] for f in flights}
     covered = set()  # Set of already covered flights
     assignments = []  # Final assignment result
 
+    # Flight → shifts covering it, and pending flights covered by each shift
+    shifts_by_flight = defaultdict(list)
+    coverage = []
+    for i, sh in enumerate(shifts):
+        in_scope = set(sh["flights"]) & all_flights
+        for fid in in_scope:
+            shifts_by_flight[fid].append(i)
+        coverage.append(len(in_scope))
+
+    # Lazy max-heap on (coverage, -duration), ties by position in shifts. Entries keep the
+    # coverage they were pushed with and are re-scored only when popped (coverage never grows)
+    heap = [(-coverage[i], sh["duration_hours"], i) for i, sh in enumerate(shifts) if coverage[i]]
+    heapq.heapify(heap)
+
+    # Planning units (airport, role, day) present in the shifts
+    shift_days = {(sh["airport"], sh["role"], sh["start"].date()) for sh in shifts}
+
+    def has_compatible_worker(sh):
+        role, apt = sh["role"], sh["airport"]
+        start = sh["start"]
+        day_key = (apt, role, start.date())
+        eligible = worker_pool.eligible_workers(
+            apt, worker_prefix(role), start, sh["duration_hours"], assigned_day[day_key],
+            max_weekly_hours, min_rest_hours_between_shifts, max_consecutive_days
+        )
+        return next(eligible, None) is not None
+
     # Greedy assignment
     while covered != all_flights: # While flights not being assigned
-        pending = all_flights - covered # Remaining flights
-
-        # Select shifts that cover at least one pending flight
-        valid_shifts = [sh for sh in shifts if any(fid in pending for fid in sh["flights"])]
-        if not valid_shifts:
-            break  # All flights covered
-
-        # Try to find shifts that match with existing workers
-        compatible = []
-        for sh in valid_shifts: # For each shift
-            role, apt = sh["role"], sh["airport"]
-            start = sh["start"]
-            iso_year, iso_week, _ = start.date().isocalendar() # Weekly hours control
-            day_key = (apt, role, start.date())
-
-            for wid in existing_workers: # get worker
-                if not wid.startswith(f"{apt}-{role_prefix.get(role, role[:2].upper())}"):
-                    continue
-                if wid in assigned_day[day_key]:
-                    continue
-                # Weekly hours constraint
-                if hour_counter[(wid, iso_year, iso_week)] + sh["duration_hours"] > max_weekly_hours:
-                    continue
-                # Rest between shifts
-                last_end = last_shift_end_time.get(wid)
-                if last_end and start < last_end + timedelta(hours=min_rest_hours_between_shifts):
-                    continue
-                # Max consecutive work days
-                last_day, streak = streak_tracker.get(wid, (None, 0))
-                new_streak = (
-                    streak + 1
-                    if last_day and start.date() == last_day + timedelta(days=1)
-                    else (streak if last_day and start.date() == last_day else 1)
-                )
-                if new_streak > max_consecutive_days:
-                    continue
-                compatible.append(sh)
-                break  # Found at least one compatible worker
-
-        # If compatible shifts exist, use them; otherwise use any valid
-        pool = compatible if compatible else valid_shifts
-
         # Select the best shift:
-        # Priority 1: covers more pending flights
-        # Priority 2: shorter duration
-        best = min(pool, key=lambda sh: (-len(set(sh["flights"]) & pending), sh["duration_hours"]))
+        # Priority 1: compatible with an existing worker (if any shift is)
+        # Priority 2: covers more pending flights
+        # Priority 3: shorter duration
+        best = None
+        fallback = None   # Best valid shift, used if no shift is compatible
+        skipped = []      # Up-to-date entries without compatible worker
+        # Compatibility only matters if some unit has a worker not yet busy that day
+        any_free = any(
+            worker_pool.worker_count(apt, worker_prefix(role)) > len(assigned_day[(apt, role, day)])
+            for apt, role, day in shift_days
+        )
+        while heap:
+            entry = heapq.heappop(heap)
+            neg_cov, duration, i = entry
+            if -neg_cov != coverage[i]:
+                # Stale score: re-score, or drop if it covers nothing pending
+                if coverage[i]:
+                    heapq.heappush(heap, (-coverage[i], duration, i))
+                continue
+            if fallback is None:
+                fallback = shifts[i]
+            skipped.append(entry)
+            if not any_free:
+                break
+            if has_compatible_worker(shifts[i]):
+                best = shifts[i]
+                break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+        if best is None:
+            best = fallback
+        if best is None:
+            break  # No shift covers a pending flight
 
         # Extract shift info
         role, apt = best["role"], best["airport"]
         start, end = best["start"], best["end"]
-        iso_year, iso_week, _ = start.date().isocalendar()
         day_key = (apt, role, start.date())
-        prefix = role_prefix.get(role, role[:2].upper())
+        prefix = worker_prefix(role)
 
-        # Try to assign to an existing worker
-        worker_id = None
-        for wid in sorted(existing_workers):
-            if not wid.startswith(f"{apt}-{prefix}"): # Same airport and role
-                continue
-            if wid in assigned_day[day_key]: # Not shift that day
-                continue
-            if hour_counter[(wid, iso_year, iso_week)] + best["duration_hours"] > max_weekly_hours: # Weekly hours restriction
-                continue
-            last_end = last_shift_end_time.get(wid)
-            if last_end and start < last_end + timedelta(hours=min_rest_hours_between_shifts): # Rest between shifts
-                continue
-            last_day, streak = streak_tracker.get(wid, (None, 0)) # Consecutive days
-            new_streak = (
-                streak + 1
-                if last_day and start.date() == last_day + timedelta(days=1)
-                else (streak if last_day and start.date() == last_day else 1)
-            )
-            if new_streak > max_consecutive_days:
-                continue
-            # Assign this shift to this worker
-            worker_id = wid
-            streak_tracker[wid] = (start.date(), new_streak)
-            break
+        # Try to assign to an existing worker (lowest worker ID first)
+        eligible = worker_pool.eligible_workers(
+            apt, prefix, start, best["duration_hours"], assigned_day[day_key],
+            max_weekly_hours, min_rest_hours_between_shifts, max_consecutive_days
+        )
+        worker_id, streak = next(eligible, (None, 1))
 
         # If no existing worker fits, create a new one
         if worker_id is None:
-            worker_id = next_worker_id(apt, prefix, existing_workers)
-            existing_workers.add(worker_id)
-            streak_tracker[worker_id] = (start.date(), 1)
+            worker_id = worker_pool.new_worker(apt, prefix)
 
         # Register assignment and update tracking structures
         assignments.append({"worker_id": worker_id, "shift": best})
-        covered.update(best["flights"])
-        hour_counter[(worker_id, iso_year, iso_week)] += best["duration_hours"]
+        for fid in best["flights"]:
+            if fid in all_flights and fid not in covered:
+                covered.add(fid)
+                for j in shifts_by_flight[fid]:
+                    coverage[j] -= 1
+        worker_pool.record_shift(apt, prefix, worker_id, start, end, best["duration_hours"], streak)
         assigned_day[day_key].add(worker_id)
-        last_shift_end_time[worker_id] = end
+
+    if stats is not None:
+        stats["greedy_iterations"] = stats.get("greedy_iterations", 0) + len(assignments)
+        stats["eligibility_checks"] = stats.get("eligibility_checks", 0) + worker_pool.eligibility_checks - pool_counts[0]
+        stats["workers_scanned"] = stats.get("workers_scanned", 0) + worker_pool.workers_scanned - pool_counts[1]
 
     # Return the final assignments and any flights left uncovered
     return assignments, all_flights - covered
-
-
-# Generate unique worker IDs
-def next_worker_id(apt, prefix, existing): # Existing are currently IDs
-    """
-    Returns the next available worker ID like 'BCN-SP1', 'BCN-SP2', ...
-    """
-    nums = [
-        int(w[len(f"{apt}-{prefix}") :]) # Extract number
-        for w in existing
-        if w.startswith(f"{apt}-{prefix}") and w[len(f"{apt}-{prefix}") :].isdigit()
-    ]
-    return f"{apt}-{prefix}{max(nums, default=0) + 1}"
-
-
-
@@ -1,52 +1,135 @@
-from datetime import datetime, timedelta
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
 
 def build_flight_objects(df, worker_rules):
 
     """
-    Transforms a DataFrame of flight data into a list of structured flight dictionaries (Example at the end). A dictionary is easily to access.
+    Transforms a DataFrame of flight data into structured flights (Example at the end).
+    All role windows are computed at once on NumPy datetime64 columns by merging the
+    flights with the rules table; the result is a FlightStore, a list-like of read-only
+    flight dictionaries.
     
     Parameters:
         df (DataFrame): Flight data with columns ['ID', 'Airport', 'Day', 'Departure Time', 'Operation Type']
         worker_rules (dict): Dictionary of role-based pre/post rules per operation type.
     
     Returns:
-        list: A list of dictionaries, one per flight, with role-specific time windows.
+        FlightStore: One flight per row, with role-specific time windows.
     """
+    df = df.reset_index(drop=True)
 
-    def create_flight(row):
-        """
-        Builds the dictionary for a single flight using the row data and worker_rules.
-        Calculates the time window for each role involved in the operation.
-        """
-        # Combine day, time, adn operation
-        departure_datetime = datetime.combine(row['Day'], row['Departure Time'])
-        operation_type = str(row['Operation Type']).strip().upper()
-
-        workers = {}
-
-        # Loop through roles and check if apply
-        for role, op_rules in worker_rules.items():
-            if operation_type in op_rules: 
-                # Get pre/post minutes
-                pre = op_rules[operation_type]['pre']
-                post = op_rules[operation_type]['post']
-                # Time window
-                workers[role] = {
-                    'start': departure_datetime - timedelta(minutes=pre),
-                    'end': departure_datetime + timedelta(minutes=post)
-                }
-
-        # return object
-        return {
-            'id': row['ID'],
-            'airport': row['Airport'],
-            'departure': departure_datetime,
-            'operation_type': operation_type,
-            'workers': workers  # solo si el rol aplica a ese tipo de operación. Diccionario con todos los trabajadores para este vuelo
-        }
+    # Combine day and time
+    day = pd.to_datetime(df['Day']).dt.normalize()
+    departure = (day + pd.to_timedelta(df['Departure Time'].astype(str))).to_numpy(dtype='datetime64[s]')
+    operation_type = df['Operation Type'].astype(str).str.strip().str.upper()
+
+    # Rules as a table: one row per (role, operation type)
+    roles = list(worker_rules.keys())
+    rules = pd.DataFrame(
+        [(r, role, op, rule['pre'], rule['post'])
+         for r, (role, op_rules) in enumerate(worker_rules.items())
+         for op, rule in op_rules.items()],
+        columns=['RoleIndex', 'Role', 'Operation Type', 'Pre', 'Post']
+    )
+
+    # Flights × applicable roles
+    windows = pd.DataFrame({'Flight': np.arange(len(df)), 'Operation Type': operation_type}).merge(rules, on='Operation Type')
+    flight_idx = windows['Flight'].to_numpy()
+    role_idx = windows['RoleIndex'].to_numpy()
+
+    # Time window per role (NaT if the role does not apply to the operation)
+    starts = np.full((len(roles), len(df)), np.datetime64('NaT'), dtype='datetime64[s]')
+    ends = np.full((len(roles), len(df)), np.datetime64('NaT'), dtype='datetime64[s]')
+    starts[role_idx, flight_idx] = departure[flight_idx] - windows['Pre'].to_numpy().astype('timedelta64[m]')
+    ends[role_idx, flight_idx] = departure[flight_idx] + windows['Post'].to_numpy().astype('timedelta64[m]')
+
+    return FlightStore(
+        df['ID'].to_numpy(dtype=object),
+        df['Airport'].to_numpy(dtype=object),
+        departure,
+        operation_type.to_numpy(dtype=object),
+        roles,
+        starts,
+        ends
+    )
+
+
+class FlightStore(Sequence):
+    """
+    Columnar flights: one array per field and one (role × flight) array for window
+    starts and ends. Indexing returns a FlightView, which reads like the flight
+    dictionary of the example below.
+    """
+
+    def __init__(self, ids, airports, departures, operation_types, roles, starts, ends):
+        self.ids = ids                          # Flight IDs
+        self.airports = airports                # Airport codes
+        self.departures = departures            # datetime64[s]
+        self.operation_types = operation_types  # Cleaned operation types ('ARR/DEP', ...)
+        self.roles = roles                      # Role order (as in worker_rules)
+        self.starts = starts                    # datetime64[s], roles × flights, NaT if not applicable
+        self.ends = ends
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [FlightView(self, j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return FlightView(self, i)
+
+
+class FlightView(Mapping):
+    """
+    Read-only dictionary view of one flight of a FlightStore.
+    Keys: 'id', 'airport', 'departure', 'operation_type', 'workers'.
+    """
+    __slots__ = ("store", "i")
+    FIELDS = ('id', 'airport', 'departure', 'operation_type', 'workers')
+
+    def __init__(self, store, i):
+        self.store = store
+        self.i = i
+
+    def __getitem__(self, key):
+        store, i = self.store, self.i
+        if key == 'id':
+            return store.ids[i]
+        if key == 'airport':
+            return store.airports[i]
+        if key == 'departure':
+            return store.departures[i].item()
+        if key == 'operation_type':
+            return store.operation_types[i]
+        if key == 'workers':
+            # Only roles that apply to this operation type
+            workers = {}
+            for r, role in enumerate(store.roles):
+                start = store.starts[r, i]
+                if not np.isnat(start):
+                    workers[role] = {'start': start.item(), 'end': store.ends[r, i].item()}
+            return workers
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __reduce__(self):
+        # Pickled as a plain dictionary (e.g. when sent to planner processes)
+        return (dict, (dict(self),))
 
-    flights = df.apply(create_flight, axis=1).tolist()
-    return flights # Lista final de vuelos
+    def __repr__(self):
+        return repr(dict(self))
 
 
 '''
@@ -1,14 +1,16 @@
 from datetime import timedelta
 import math
 from functions.shift_generation import consecutive_pairs_ok, build_shift_object
-from itertools import combinations
 
 
 
 
-def find_all_valid_clusters(shifts, role, max_gap_minutes):
+def find_all_valid_clusters(shifts, role, max_gap_minutes, include_subchains=False):
     """
-    Finds all valid clusters (consecutive flights) where all flight pairs are within the allowed gap.
+    Finds clusters of consecutive flights where each flight departs within the allowed gap of the previous one.
+    A single sweep over the flights sorted by departure returns the maximal chains (2 or more flights).
+    With include_subchains=True every valid sub-chain is returned too, in the order of the original
+    combinatorial search (by size, then by departure).
     """
     if role not in {"SPV PAX", "CHECKIN", "SPV RAMP", "DRIV"}:
         return []
@@ -16,24 +18,38 @@ def find_all_valid_clusters(shifts, role, max_gap_minutes):
     # Sort by departure
     sorted_shifts = sorted(shifts, key=lambda s: s["departure"])
 
-    valid_clusters = []
-
-    # Try all combinations of 2 or more flights
-    for r in range(2, len(sorted_shifts) + 1):
-        for combo in combinations(sorted_shifts, r):
-            # Check that all consecutive pairs in the combo meet the gap condition
-            is_valid = True
-            for i in range(len(combo) - 1):
-                t1 = combo[i]["departure"]
-                t2 = combo[i+1]["departure"]
-                gap = (t2 - t1).total_seconds() / 60
-                if gap > max_gap_minutes:
-                    is_valid = False
-                    break
-            if is_valid:
-                valid_clusters.append(list(combo))
-
-    return valid_clusters
+    # Sweep: a gap above the limit closes the current chain
+    chains = []
+    chain_start = 0
+    for i in range(1, len(sorted_shifts) + 1):
+        if i < len(sorted_shifts):
+            gap = (sorted_shifts[i]["departure"] - sorted_shifts[i-1]["departure"]).total_seconds() / 60
+            if gap <= max_gap_minutes:
+                continue
+        if i - chain_start >= 2:
+            chains.append((chain_start, i))
+        chain_start = i
+
+    if not include_subchains:
+        return [sorted_shifts[start:end] for start, end in chains]
+
+    # Sub-chains never cross the end of a maximal chain
+    sub_chains = []
+
+    def extend(chain, end):
+        for j in range(chain[-1] + 1, end):
+            gap = (sorted_shifts[j]["departure"] - sorted_shifts[chain[-1]]["departure"]).total_seconds() / 60
+            if gap > max_gap_minutes:
+                break
+            sub_chains.append(chain + [j])
+            extend(chain + [j], end)
+
+    for start, end in chains:
+        for i in range(start, end):
+            extend([i], end)
+
+    sub_chains.sort(key=lambda c: (len(c), c))
+    return [[sorted_shifts[i] for i in c] for c in sub_chains]
 
 ######################
 
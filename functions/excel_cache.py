@@ -0,0 +1,96 @@
+import hashlib
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional: without pyarrow every run parses the workbook
+    pa = None
+
+# Bump when the cached columns change
+CACHE_VERSION = "1"
+
+
+def read_excel_cached(file_path, prepare, kind):
+    """
+    Reads an Excel file through a typed Arrow IPC snapshot stored next to it
+    ('<file>.cache.arrow').
+
+    - prepare(raw_df) turns the raw sheet into the typed DataFrame that is cached
+    - kind names the content ('flights', 'rules'), so one snapshot is never read as another
+    - The snapshot is reused while the workbook keeps its size and modification time,
+      or its SHA-256 if those changed; otherwise the workbook is parsed again
+    - The snapshot is memory-mapped on read
+    Without pyarrow, or if the snapshot cannot be written, the workbook is simply parsed.
+    """
+    if pa is None:
+        return prepare(pd.read_excel(file_path))
+
+    cache_path = f"{file_path}.cache.arrow"
+    stat = os.stat(file_path)
+    key = {
+        b"kind": kind.encode(),
+        b"version": CACHE_VERSION.encode(),
+        b"size": str(stat.st_size).encode(),
+        b"mtime": str(stat.st_mtime_ns).encode(),
+    }
+
+    if os.path.exists(cache_path):
+        try:
+            with pa.memory_map(cache_path) as source:
+                reader = pa.ipc.open_file(source)
+                metadata = reader.schema.metadata or {}
+                same_key = all(metadata.get(k) == v for k, v in key.items())
+                # Touched but not modified (e.g. copied): compare contents
+                same_file = same_key or (
+                    all(metadata.get(k) == key[k] for k in (b"kind", b"version", b"size"))
+                    and metadata.get(b"sha256") == file_sha256(file_path).encode()
+                )
+                if same_file:
+                    table = reader.read_all()
+                    if not same_key:
+                        # Store the new modification time, so later runs do not hash the workbook again
+                        write_snapshot(cache_path, table.replace_schema_metadata({**metadata, **key}))
+                    return table.to_pandas()
+        except (OSError, pa.ArrowException):
+            pass  # Unreadable snapshot: rebuild it
+
+    df = prepare(pd.read_excel(file_path))
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except pa.ArrowException:
+        return df  # Columns Arrow cannot type: run without snapshot
+    write_snapshot(cache_path, table.replace_schema_metadata({
+        **(table.schema.metadata or {}), **key, b"sha256": file_sha256(file_path).encode()
+    }))
+
+    return df
+
+
+def write_snapshot(cache_path, table):
+    """
+    Writes table as the Arrow IPC snapshot cache_path (through a temporary file, so a
+    reader never sees it half written). Does nothing if it cannot be written (e.g.
+    read-only folder, or a snapshot still mapped on Windows).
+    """
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pa.ArrowException):
+        pass
+
+
+def file_sha256(file_path):
+    """
+    SHA-256 of a file's bytes (hex).
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,15 +1,37 @@
 import pandas as pd
 
-def load_excel_data(file_path):
+from functions.excel_cache import read_excel_cached
+
+def load_excel_data(file_path, use_cache=True):
     """
     Loads flight data from an Excel file and returns:
     - Full DataFrame
     - Lists for: flight IDs, airports, departure hours, minutes, and days (Debugging)
+
+    With use_cache, the cleaned data is kept in a typed Arrow snapshot next to the
+    workbook (see read_excel_cached), so later runs skip the Excel parsing.
     """
 
     # Read Excel file
-    df = pd.read_excel(file_path)
+    if use_cache:
+        df = read_excel_cached(file_path, clean_flight_data, "flights")
+    else:
+        df = clean_flight_data(pd.read_excel(file_path))
+
+    # Extract columns as individual variables (For debbugging)
+    flight_ids = df['ID'].tolist()
+    airports = df['Airport'].tolist()
+    hours = df['Hour'].tolist()
+    minutes = df['Minute'].tolist()
+    days = df['Day'].tolist()
+
+    return df
 
+
+def clean_flight_data(df):
+    """
+    Cleans the raw flight sheet: column names, missing rows, dates and departure times.
+    """
     # Clean column names (remove spaces)
     df.columns = [col.strip() for col in df.columns]
 
@@ -17,21 +39,19 @@ def load_excel_data(file_path):
     required_columns = ['ID', 'Airport', 'Time', 'Day']
     df = df.dropna(subset=required_columns)
 
-    # Parse date column to date data type
-    df['Day'] = pd.to_datetime(df['Day'], dayfirst=True)
+    # Parse date column to date data type (ISO text as is, other text day first)
+    day = pd.to_datetime(df['Day'], format='ISO8601', errors='coerce')
+    if day.isna().any():
+        day = pd.to_datetime(df['Day'], dayfirst=True)
+    df['Day'] = day
 
     # Force 'Time' column into 'HH:MM' format (ignore seconds if any)
-    df['Departure Time'] = pd.to_datetime(df['Time'].astype(str).str[:5], format='%H:%M').dt.time
+    df['Time'] = df['Time'].astype(str)
+    departure = pd.to_datetime(df['Time'].str[:5], format='%H:%M')
+    df['Departure Time'] = departure.dt.time
 
     # Extract hour and minute values from 'Departure Time'
-    df['Hour'] = df['Departure Time'].apply(lambda t: t.hour)
-    df['Minute'] = df['Departure Time'].apply(lambda t: t.minute)
-
-    # Extract columns as individual variables (For debbugging)
-    flight_ids = df['ID'].tolist()
-    airports = df['Airport'].tolist()
-    hours = df['Hour'].tolist()
-    minutes = df['Minute'].tolist()
-    days = df['Day'].tolist()
+    df['Hour'] = departure.dt.hour
+    df['Minute'] = departure.dt.minute
 
-    return df
\ No newline at end of file
+    return df
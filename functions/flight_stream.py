@@ -0,0 +1,63 @@
+import pandas as pd
+
+from functions.flight_data import clean_flight_data
+from functions.builder import build_flight_objects
+
+
+def stream_flight_days(file_path, worker_rules, chunksize=50000):
+    """
+    Reads a CSV or JSON-lines flight schedule in chunks and yields one planning day at a time:
+    (airport, day, flights), with flights as built by build_flight_objects.
+
+    - Same columns as the Excel input: ID, Airport, Operation Type, Time, Day
+    - Rows must be sorted by (airport, day); only the day being read is kept in memory
+    - Raises ValueError if an (airport, day) appears after a later one
+    """
+    if file_path.lower().endswith((".jsonl", ".json")):
+        chunks = pd.read_json(file_path, lines=True, chunksize=chunksize, dtype=False)
+    else:
+        chunks = pd.read_csv(file_path, chunksize=chunksize)
+
+    current_key = None
+    current_rows = []  # Chunk slices of the (airport, day) being read
+
+    for chunk in chunks:
+        chunk = clean_flight_data(chunk)
+        if chunk.empty:
+            continue
+
+        # Segments of consecutive rows with the same (airport, day)
+        airport = chunk['Airport']
+        day = chunk['Day'].dt.normalize()
+        segment = ((airport != airport.shift()) | (day != day.shift())).cumsum()
+
+        for _, rows in chunk.groupby(segment, sort=False):
+            key = (rows['Airport'].iloc[0], rows['Day'].iloc[0].date())
+            if key == current_key:
+                current_rows.append(rows)
+                continue
+            if current_key is not None:
+                if key < current_key:
+                    raise ValueError(f"{file_path}: rows must be sorted by airport and day ({key} after {current_key})")
+                yield current_key[0], current_key[1], build_flight_objects(pd.concat(current_rows), worker_rules)
+            current_key = key
+            current_rows = [rows]
+
+    if current_key is not None:
+        yield current_key[0], current_key[1], build_flight_objects(pd.concat(current_rows), worker_rules)
+
+
+class StreamedFlights:
+    """
+    Flights of a streamed schedule that can be iterated more than once:
+    each iteration reads the file again, one (airport, day) at a time.
+    """
+
+    def __init__(self, file_path, worker_rules, chunksize=50000):
+        self.file_path = file_path
+        self.worker_rules = worker_rules
+        self.chunksize = chunksize
+
+    def __iter__(self):
+        for _, _, day_flights in stream_flight_days(self.file_path, self.worker_rules, self.chunksize):
+            yield from day_flights
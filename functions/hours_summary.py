@@ -1,7 +1,5 @@
 from tabulate import tabulate
-from matplotlib.backends.backend_pdf import PdfPages
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta, date
 from collections import defaultdict
 
@@ -45,35 +43,47 @@ def print_worker_hours_summary(hour_counter):
             print(f"Airport: {airport}")
             print(tabulate(summary[week_range][airport], headers="keys", tablefmt="fancy_grid", stralign="center"))
 
-def export_worker_hours_summary_to_pdf(hour_counter, output_path):
+def export_worker_hours_summary_to_pdf(hour_counter, output_path, workers=1):
     """
     Exports a summary of hours worked to a PDF file, grouped by week and airport.
+    Pages can be drawn by several processes (workers), see render_pages_to_pdf.
     """
+    from functions.pdf_render import render_pages_to_pdf
+
     summary = build_worker_hours_summary_by_airport(hour_counter)
 
-    with PdfPages(output_path) as pdf:
-        for week_range in sorted(summary.keys()):
-            for airport in sorted(summary[week_range].keys()):
-                df = pd.DataFrame(summary[week_range][airport])
-                fig, ax = plt.subplots(figsize=(10, 0.4 * len(df) + 2))
-                ax.axis("off")
-                ax.set_title(f"Airport: {airport}  //  Week: {week_range}",
-                             fontsize=14, fontweight="bold", y=1.02)
-
-                table = ax.table(
-                    cellText=df.values,
-                    colLabels=df.columns,
-                    cellLoc='center',
-                    loc='center'
-                )
-                table.auto_set_font_size(False)
-                table.set_fontsize(9)
-
-                pdf.savefig(fig)
-                plt.close(fig)
+    # One page per (week, airport)
+    pages = [
+        (week_range, airport, summary[week_range][airport])
+        for week_range in sorted(summary.keys())
+        for airport in sorted(summary[week_range].keys())
+    ]
+    render_pages_to_pdf(_draw_hours_page, pages, output_path, workers)
 
     print(f"PDF summary exported to: {output_path}")
 
+def _draw_hours_page(week_range, airport, rows):
+    """
+    Draws the hours table of one (week, airport).
+    """
+    import matplotlib.pyplot as plt
+
+    df = pd.DataFrame(rows)
+    fig, ax = plt.subplots(figsize=(10, 0.4 * len(df) + 2))
+    ax.axis("off")
+    ax.set_title(f"Airport: {airport}  //  Week: {week_range}",
+                 fontsize=14, fontweight="bold", y=1.02)
+
+    table = ax.table(
+        cellText=df.values,
+        colLabels=df.columns,
+        cellLoc='center',
+        loc='center'
+    )
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+    return fig
+
 def parse_worker_id(worker_id):
     """
     Extracts airport and full role from a worker ID like 'BCN-SP1'.
@@ -0,0 +1,181 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# Stages of a (role, airport, day) unit, in pipeline order; "solve" is per partition
+TRACE_STAGES = ("cache", "cluster", "generate", "assign", "replay", "solve")
+
+# Counters of a unit: combinations examined by the shift generator (labels extended when
+# shifts are priced), LP rounds of the shift pricing, dominated shifts pruned, shifts kept,
+# greedy iterations (assignments tried), worker eligibility checks and workers scanned by
+# them, shift cache hits and misses
+TRACE_COUNTERS = ("combinations", "pricing_rounds", "shifts_pruned", "shifts_kept", "greedy_iterations",
+                  "eligibility_checks", "workers_scanned", "cache_hits", "cache_misses")
+
+
+class PlanTrace:
+    """
+    Instrumentation of a planning run: wall time of every stage and counters, per
+    (role, airport, day) unit, plus one timed event per stage call for a Chrome trace.
+
+    Planner processes fill their own PlanTrace, which is merged into the caller's
+    (see run_planning). Event timestamps are wall clock, so events of different
+    processes line up in the trace viewer.
+
+    memory: also record the peak memory allocated during each stage (above what was
+    allocated when it started), while tracemalloc is tracing; peak_bytes keeps the
+    highest traced memory seen, as the stages reset the tracemalloc peak.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.peak_bytes = 0
+        self.units = {}   # (role, airport, day) → {"stages": {stage: seconds}, "counters": {counter: n}, "peak_mb": {stage: MB}}
+        self.events = []  # (stage, unit, wall start µs, duration µs, pid)
+
+    def unit(self, unit):
+        """
+        Record of a unit, created empty on first use.
+        """
+        record = self.units.get(unit)
+        if record is None:
+            record = self.units[unit] = {"stages": {}, "counters": {}, "peak_mb": {}}
+        return record
+
+    @contextmanager
+    def stage(self, unit, name):
+        """
+        Times the block as stage name of unit.
+        """
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peak_bytes = max(self.peak_bytes, peak)
+            tracemalloc.reset_peak()
+        wall = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            record = self.unit(unit)
+            record["stages"][name] = record["stages"].get(name, 0.0) + elapsed
+            self.events.append((name, unit, int(wall * 1e6), int(elapsed * 1e6), os.getpid()))
+            if memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_bytes = max(self.peak_bytes, peak)
+                record["peak_mb"][name] = max(record["peak_mb"].get(name, 0.0), (peak - current) / 2**20)
+
+    def count(self, unit, name, n=1):
+        """
+        Adds n to counter name of unit.
+        """
+        counters = self.unit(unit)["counters"]
+        counters[name] = counters.get(name, 0) + n
+
+    def merge(self, other):
+        """
+        Adds the units and events of another trace (e.g. of a planner process).
+        """
+        for unit, record in other.units.items():
+            mine = self.unit(unit)
+            for name, seconds in record["stages"].items():
+                mine["stages"][name] = mine["stages"].get(name, 0.0) + seconds
+            for name, n in record["counters"].items():
+                mine["counters"][name] = mine["counters"].get(name, 0) + n
+            for name, mb in record.get("peak_mb", {}).items():
+                mine["peak_mb"][name] = max(mine["peak_mb"].get(name, 0.0), mb)
+        self.peak_bytes = max(self.peak_bytes, other.peak_bytes)
+        self.events.extend(other.events)
+
+    def summary_rows(self, top=None):
+        """
+        One row per unit, slowest first: stage seconds, counters and workers scanned
+        per eligibility check. top: only the slowest units.
+        """
+        rows = []
+        for (role, airport, day), record in self.units.items():
+            stages, counters = record["stages"], record["counters"]
+            checks = counters.get("eligibility_checks", 0)
+            row = {"Role": role, "Airport": airport, "Day": day if day is not None else "all",
+                   "Total (s)": round(sum(stages.values()), 4)}
+            row.update({f"{name} (s)": round(stages.get(name, 0.0), 4) for name in TRACE_STAGES})
+            row.update({name: counters.get(name, 0) for name in TRACE_COUNTERS})
+            row["scanned/check"] = round(counters.get("workers_scanned", 0) / checks, 2) if checks else 0
+            rows.append(row)
+        rows.sort(key=lambda row: -row["Total (s)"])
+        return rows[:top] if top else rows
+
+    def totals(self):
+        """
+        Seconds per stage and counters summed over all units.
+        """
+        stages = dict.fromkeys(TRACE_STAGES, 0.0)
+        counters = dict.fromkeys(TRACE_COUNTERS, 0)
+        for record in self.units.values():
+            for name, seconds in record["stages"].items():
+                stages[name] = stages.get(name, 0.0) + seconds
+            for name, n in record["counters"].items():
+                counters[name] = counters.get(name, 0) + n
+        return stages, counters
+
+    def stage_stats(self):
+        """
+        Per stage that occurred: seconds and calls summed over all units, and the largest
+        peak memory of a call (MB, 0 unless memory).
+        """
+        stats = {}
+        for name, *_ in self.events:
+            stats.setdefault(name, {"seconds": 0.0, "calls": 0, "peak_mb": 0.0})["calls"] += 1
+        for record in self.units.values():
+            for name, seconds in record["stages"].items():
+                stats[name]["seconds"] += seconds
+            for name, mb in record["peak_mb"].items():
+                stats[name]["peak_mb"] = max(stats[name]["peak_mb"], mb)
+        return {name: stats[name] for name in TRACE_STAGES if name in stats}
+
+    def print_summary(self, top=20):
+        """
+        Prints the slowest units and the totals per stage and counter.
+        """
+        from tabulate import tabulate
+
+        rows = self.summary_rows(top)
+        # Only stages and counters that occurred in the run
+        stages, counters = self.totals()
+        shown = [f"{name} (s)" for name in TRACE_STAGES if stages[name]] + [n for n in TRACE_COUNTERS if counters[n]]
+        columns = ["Role", "Airport", "Day", "Total (s)"] + shown + ["scanned/check"]
+        print(f"=== Slowest {len(rows)} of {len(self.units)} units ===")
+        print(tabulate([[row[c] for c in columns] for row in rows], headers=columns, tablefmt="fancy_grid", stralign="center"))
+        print("Stage totals (s): " + ", ".join(f"{name} {seconds:.3f}" for name, seconds in stages.items() if seconds))
+        print("Counters: " + ", ".join(f"{name} {n}" for name, n in counters.items() if n))
+
+    def export_chrome_trace(self, output_path):
+        """
+        Writes the stage events as Chrome trace-event JSON (chrome://tracing, Perfetto):
+        one complete event per stage call, one thread per airport and role.
+        """
+        threads = {}
+        events = []
+        for name, (role, airport, day), start, duration, pid in sorted(self.events, key=lambda e: e[2]):
+            tid = threads.setdefault((pid, airport, role), len(threads) + 1)
+            events.append({
+                "name": name, "cat": "planning", "ph": "X", "ts": start, "dur": duration, "pid": pid, "tid": tid,
+                "args": {"role": role, "airport": airport, "day": str(day) if day is not None else "all"},
+            })
+        for (pid, airport, role), tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": f"{airport} {role}"}})
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"Trace exported to: {output_path}")
+        return output_path
+
+
+def trace_stage(trace, unit, name):
+    """
+    trace.stage(unit, name), or a no-op context if trace is None.
+    """
+    return trace.stage(unit, name) if trace is not None else nullcontext()
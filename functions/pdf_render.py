@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # Optional: without pypdf pages are always rendered serially
+    PdfWriter = None
+
+# No creation date in the files, so the same pages give the same bytes
+PDF_METADATA = {"CreationDate": None}
+
+
+def render_pages_to_pdf(draw_page, pages, output_path, workers=1):
+    """
+    Renders one figure per page into a PDF.
+
+    - draw_page(*page) draws a page and returns its figure (None to skip it);
+      it must be a module-level function so worker processes can run it
+    - pages: list of argument tuples, in the order the pages appear in the PDF
+    - With workers > 1 (and pypdf installed) pages are drawn in a process pool:
+      each task renders a contiguous run of pages into a fragment PDF, and the
+      fragments are merged in page order, whatever order they finish in
+    """
+    if workers <= 1 or PdfWriter is None or len(pages) <= 1:
+        _render_fragment(draw_page, pages, output_path)
+        return
+
+    # A few runs per worker so long and short pages even out
+    runs = min(len(pages), workers * 4)
+    bounds = [len(pages) * i // runs for i in range(runs + 1)]
+
+    fragment_dir = tempfile.mkdtemp(prefix=".pages-", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        fragment_paths = [os.path.join(fragment_dir, f"{i:05d}.pdf") for i in range(runs)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = [
+                executor.submit(_render_fragment, draw_page, pages[bounds[i]:bounds[i + 1]], fragment_paths[i])
+                for i in range(runs)
+            ]
+            for job in jobs:
+                job.result()
+
+        writer = PdfWriter()
+        for path in fragment_paths:
+            if os.path.exists(path):  # Runs with no drawn page write no file
+                writer.append(path)
+        with open(output_path, "wb") as f:
+            writer.write(f)
+    finally:
+        shutil.rmtree(fragment_dir, ignore_errors=True)
+
+
+def _render_fragment(draw_page, pages, output_path):
+    """
+    Draws pages one after another into a single PDF (not written if no page is drawn).
+    """
+    with PdfPages(output_path, metadata=PDF_METADATA) as pdf:
+        for page in pages:
+            fig = draw_page(*page)
+            if fig is None:
+                continue
+            pdf.savefig(fig)
+            plt.close(fig)
@@ -0,0 +1,90 @@
+import json
+
+# Output levels of a planning run, from least to most verbose
+LOG_LEVELS = ("quiet", "summary", "full")
+
+
+class PlanLog:
+    """
+    Screen output of a planning run, by level:
+      - quiet: only the flights left uncovered
+      - summary: one line per (role, airport, day) and the totals of the plan
+      - full: also the shift table of every unit and the final assignment table
+    Tables are only formatted (tabulate) at full level.
+
+    jsonl_path: optional JSON-lines file getting one record per unit and one for the
+    plan, whatever the level. Use as a context manager (or call close) so it is flushed.
+    """
+
+    def __init__(self, level="summary", jsonl_path=None):
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level '{level}': expected one of {', '.join(LOG_LEVELS)}")
+        self.level = level
+        self.jsonl_path = jsonl_path
+        self._sink = open(jsonl_path, "w", encoding="utf-8") if jsonl_path else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._sink:
+            self._sink.close()
+            self._sink = None
+
+    def record(self, event, **fields):
+        """
+        Writes one JSON line {"event": event, ...} to the sink, if any.
+        """
+        if self._sink:
+            self._sink.write(json.dumps({"event": event, **fields}, default=str) + "\n")
+
+    def unit(self, role, airport, day, shifts, not_covered):
+        """
+        Logs a planned unit; same signature as the on_unit callback of run_planning.
+        """
+        if self.level != "quiet":
+            print(f"Task {role}, Airport {airport}, Day {day}: {len(shifts)} shifts")
+        if self.level == "full":
+            from functions.print_shifts import print_shifts_table
+            print_shifts_table(shifts)
+        if not_covered:
+            print(f"WARNING: {len(not_covered)} flight(s) not covered: {sorted(not_covered)}")
+        self.record("unit", role=role, airport=airport, day=day.isoformat(), shifts=len(shifts),
+                    not_covered=sorted(not_covered))
+
+    def plan(self, plan):
+        """
+        Logs the totals of a plan (see run_planning) and, at full level, the final
+        assignment table.
+        """
+        all_assignments = plan["all_assignments"]
+        workers = len({a["worker_id"] for a in all_assignments})
+        self.record("plan", shift_count=plan["shift_count"], assignments=len(all_assignments), workers=workers,
+                    pruned_shifts=plan.get("pruned_shifts", 0), shift_cache=plan.get("shift_cache"),
+                    incremental=plan.get("incremental"),
+                    solver=[dict(r, gap=r["gap"] if r["gap"] != float("inf") else None) for r in plan.get("solver", [])])
+        if self.level == "quiet":
+            return
+
+        # Summary shift generation and assignments
+        print(f"Total shifts generated across all roles: {plan['shift_count']}")
+        print(f"Total workers assigned: {len(all_assignments)}")
+        if plan.get("pruned_shifts"):
+            print(f"Dominated shifts pruned: {plan['pruned_shifts']}")
+        if "shift_cache" in plan and sum(plan["shift_cache"].values()):
+            print(f"Shift cache: {plan['shift_cache']['hits']} hits, {plan['shift_cache']['misses']} misses")
+        if plan.get("incremental", {}).get("reused"):
+            print(f"Incremental: {plan['incremental']['reused']} units reused, {plan['incremental']['replanned']} re-planned")
+        for report in plan.get("solver", []):
+            gap = f"{report['gap']:.2%}" if report["gap"] is not None and report["gap"] != float("inf") else "n/a"
+            print(f"Solver {report['solver']} {report['airport']}-{report['prefix']}: {report['status']}, "
+                  f"workers {report['greedy_workers']} → {report['workers']}, hours {report['greedy_hours']} → {report['hours']}, gap {gap}")
+
+        # Final assignments (screen)
+        if self.level == "full":
+            from functions.print_shifts import print_worker_assignments
+            print("=== Final assignment table ===")
+            print_worker_assignments(all_assignments)
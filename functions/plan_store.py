@@ -0,0 +1,191 @@
+import json
+from collections import defaultdict
+
+import numpy as np
+
+# Bump when the stored columns change
+PLAN_FORMAT_VERSION = 3
+
+SHIFT_TIMES = ("start", "end", "start_1", "end_1", "start_2", "end_2")
+
+
+def save_plan(plan, flights, output_path):
+    """
+    Saves a plan (see run_planning) and the flights it covers to a compressed NumPy
+    archive (.npz), column by column:
+      - shifts: role, airport, times, duration, split and their flight IDs (flat, with offsets)
+      - flight IDs as strings, with a flag for the integer ones (restored as int on load)
+      - assignments: worker ID and row of its shift
+      - hour_counter, last_shift_end_time, streak_tracker: one column per key part
+      - flights: id, airport, departure and operation type (what the Gantt needs)
+      - units, params and roles: what incremental re-planning compares against
+    Shifts are stored once even if assigned; all_shifts is the first shift_rows rows,
+    followed by assigned shifts that are not in all_shifts (stream runs keep none).
+    """
+    shifts = list(plan["all_shifts"])
+    row_of = {id(sh): i for i, sh in enumerate(shifts)}
+    for a in plan["all_assignments"]:
+        if id(a["shift"]) not in row_of:
+            row_of[id(a["shift"])] = len(shifts)
+            shifts.append(a["shift"])
+
+    flights = list(flights)
+    hours = sorted(plan["hour_counter"].items())
+    last_end = sorted(plan["last_shift_end_time"].items())
+    streak = sorted(plan["streak_tracker"].items())
+    units = plan.get("units", [])
+
+    columns = {
+        "version": np.array(PLAN_FORMAT_VERSION),
+        "shift_rows": np.array(len(plan["all_shifts"])),
+        "shift_count": np.array(plan.get("shift_count", len(plan["all_shifts"]))),
+        # Shifts
+        "shift_role": _strings([sh["role"] for sh in shifts]),
+        "shift_airport": _strings([sh["airport"] for sh in shifts]),
+        "shift_duration": np.array([sh["duration_hours"] for sh in shifts], dtype=np.float64),
+        "shift_split": np.array([bool(sh["split"]) for sh in shifts], dtype=bool),
+        "shift_flight_offsets": np.cumsum([0] + [len(sh["flights"]) for sh in shifts]),
+        "shift_flights": _strings([fid for sh in shifts for fid in sh["flights"]]),
+        "shift_flight_int": _int_flags([fid for sh in shifts for fid in sh["flights"]]),
+        # Assignments
+        "assignment_worker": _strings([a["worker_id"] for a in plan["all_assignments"]]),
+        "assignment_shift": np.array([row_of[id(a["shift"])] for a in plan["all_assignments"]], dtype=np.int64),
+        # Worker tracking
+        "hours_worker": _strings([wid for (wid, _, _), _ in hours]),
+        "hours_year": np.array([year for (_, year, _), _ in hours], dtype=np.int64),
+        "hours_week": np.array([week for (_, _, week), _ in hours], dtype=np.int64),
+        "hours_value": np.array([value for _, value in hours], dtype=np.float64),
+        "last_end_worker": _strings([wid for wid, _ in last_end]),
+        "last_end_time": _times([end for _, end in last_end]),
+        "streak_worker": _strings([wid for wid, _ in streak]),
+        "streak_day": np.array([day for _, (day, _) in streak], dtype="datetime64[D]"),
+        "streak_days": np.array([count for _, (_, count) in streak], dtype=np.int64),
+        # Flights (for the Gantt)
+        "flight_id": _strings([f["id"] for f in flights]),
+        "flight_id_int": _int_flags([f["id"] for f in flights]),
+        "flight_airport": _strings([f["airport"] for f in flights]),
+        "flight_departure": _times([f["departure"] for f in flights]),
+        "flight_operation_type": _strings([f["operation_type"] for f in flights]),
+        # Planning units, in plan order, and the settings they were planned with
+        "unit_role": _strings([u[0] for u in units]),
+        "unit_airport": _strings([u[1] for u in units]),
+        "unit_day": np.array([u[2] for u in units], dtype="datetime64[D]"),
+        "unit_digest": _strings([u[3] for u in units]),
+        "unit_shifts": np.array([u[4] for u in units], dtype=np.int64),
+        "unit_assignments": np.array([u[5] for u in units], dtype=np.int64),
+        "params": np.array(json.dumps(plan.get("params"), sort_keys=True)),
+        "roles": _strings(plan.get("roles", [])),
+    }
+    for key in SHIFT_TIMES:
+        columns[f"shift_{key}"] = _times([sh[key] for sh in shifts])
+
+    np.savez_compressed(output_path, **columns)
+
+
+def load_plan(path):
+    """
+    Loads a plan saved by save_plan. Returns the plan dictionary of run_planning
+    (all_shifts, all_assignments, shift_count, hour_counter, last_shift_end_time,
+    streak_tracker, existing_workers, units, params, roles) plus 'flights', a list of
+    flight dictionaries with id, airport, departure and operation_type.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["version"]) != PLAN_FORMAT_VERSION:
+            raise ValueError(f"{path}: plan format {int(data['version'])}, expected {PLAN_FORMAT_VERSION}")
+        columns = {key: data[key] for key in data.files}
+
+    # Shifts
+    times = {key: columns[f"shift_{key}"].tolist() for key in SHIFT_TIMES}
+    offsets = columns["shift_flight_offsets"].tolist()
+    flight_ids = _ids(columns["shift_flights"], columns["shift_flight_int"])
+    shifts = [
+        {
+            'flights': flight_ids[offsets[i]:offsets[i + 1]],
+            'role': role,
+            'airport': airport,
+            'start': times["start"][i],
+            'end': times["end"][i],
+            'duration_hours': duration,
+            'split': split,
+            'start_1': times["start_1"][i],
+            'end_1': times["end_1"][i],
+            'start_2': times["start_2"][i],
+            'end_2': times["end_2"][i],
+        }
+        for i, (role, airport, duration, split) in enumerate(zip(
+            columns["shift_role"].tolist(), columns["shift_airport"].tolist(),
+            columns["shift_duration"].tolist(), columns["shift_split"].tolist()
+        ))
+    ]
+
+    # Assignments share the shift objects, as in a planning run
+    all_assignments = [
+        {"worker_id": wid, "shift": shifts[row]}
+        for wid, row in zip(columns["assignment_worker"].tolist(), columns["assignment_shift"].tolist())
+    ]
+
+    hour_counter = defaultdict(float)
+    for wid, year, week, value in zip(columns["hours_worker"].tolist(), columns["hours_year"].tolist(),
+                                      columns["hours_week"].tolist(), columns["hours_value"].tolist()):
+        hour_counter[(wid, year, week)] = value
+    last_shift_end_time = dict(zip(columns["last_end_worker"].tolist(), columns["last_end_time"].tolist()))
+    streak_tracker = {
+        wid: (day, count)
+        for wid, day, count in zip(columns["streak_worker"].tolist(), columns["streak_day"].tolist(),
+                                   columns["streak_days"].tolist())
+    }
+
+    flights = [
+        {"id": fid, "airport": apt, "departure": dep, "operation_type": op}
+        for fid, apt, dep, op in zip(_ids(columns["flight_id"], columns["flight_id_int"]),
+                                     columns["flight_airport"].tolist(), columns["flight_departure"].tolist(),
+                                     columns["flight_operation_type"].tolist())
+    ]
+
+    units = list(zip(
+        columns["unit_role"].tolist(), columns["unit_airport"].tolist(), columns["unit_day"].tolist(),
+        columns["unit_digest"].tolist(), columns["unit_shifts"].tolist(), columns["unit_assignments"].tolist()
+    ))
+
+    return {
+        "all_shifts": shifts[:int(columns["shift_rows"])],
+        "all_assignments": all_assignments,
+        "shift_count": int(columns["shift_count"]),
+        "existing_workers": {a["worker_id"] for a in all_assignments},
+        "hour_counter": hour_counter,
+        "last_shift_end_time": last_shift_end_time,
+        "streak_tracker": streak_tracker,
+        "units": units,
+        "params": json.loads(str(columns["params"])),
+        "roles": columns["roles"].tolist(),
+        "flights": flights,
+    }
+
+
+def _strings(values):
+    """
+    Unicode array (never object dtype, so the archive loads without pickle).
+    """
+    return np.array(values, dtype=str) if values else np.array([], dtype="U1")
+
+
+def _int_flags(values):
+    """
+    Boolean array, True for the integer flight IDs (numeric ID columns).
+    """
+    return np.array([isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values], dtype=bool)
+
+
+def _ids(strings, int_flags):
+    """
+    Flight IDs saved by _strings and _int_flags, integers restored.
+    """
+    return [int(v) if is_int else v for v, is_int in zip(strings.tolist(), int_flags.tolist())]
+
+
+def _times(values):
+    """
+    datetime64[s] array, NaT for None.
+    """
+    return np.array([np.datetime64(v, "s") if v is not None else np.datetime64("NaT") for v in values],
+                    dtype="datetime64[s]")
@@ -0,0 +1,444 @@
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from functions.shift_generation import partition_single_shifts, generate_all_shifts_9h_for_role
+from functions.assignment import assign_greedy_workers, worker_prefix
+from functions.worker_pool import WorkerPool
+from functions.cluster_group import generate_fixed_cluster_shifts, find_all_valid_clusters, select_best_non_overlapping_clusters
+from functions.instrumentation import PlanTrace, trace_stage
+
+
+def plan_day(shifts_this_day, role, worker_pool, coverage_scope, params, shift_cache=None, all_shifts_that_day=None,
+             solver=None, trace=None, stats=None):
+    """
+    Plans one (role, airport, day) unit: clusters, shift generation (without dominated
+    shifts, see prune_dominated_shifts) and greedy assignment.
+    With a shift_cache (see ShiftCache), the generated shifts are looked up before
+    clustering and stored after a miss. all_shifts_that_day skips generation (shifts
+    already generated from the same inputs). solver: generates the shifts if given
+    (not cached if it prices them, see functions.solvers).
+    trace: optional PlanTrace timing the stages and counting the work of the unit.
+    stats: optional dict, 'pruned_shifts' is increased by the dominated shifts dropped
+    (generated shifts only, not cache hits).
+    Returns (all_shifts_that_day, assignments, not_covered).
+    """
+    unit = (role, shifts_this_day[0]["airport"], shifts_this_day[0]["departure"].date()) if trace else None
+    generation = {}
+
+    if all_shifts_that_day is None and shift_cache and not (solver and solver.prices_shifts):
+        with trace_stage(trace, unit, "cache"):
+            cache_key = shift_cache.key(shifts_this_day, role, params)
+            all_shifts_that_day = shift_cache.get(cache_key, shifts_this_day)
+        if trace:
+            trace.count(unit, "cache_hits" if all_shifts_that_day is not None else "cache_misses")
+        if all_shifts_that_day is None:
+            all_shifts_that_day = generate_day_shifts(shifts_this_day, role, params, solver, trace, generation)
+            with trace_stage(trace, unit, "cache"):
+                shift_cache.put(cache_key, shifts_this_day, all_shifts_that_day)
+    if all_shifts_that_day is None:
+        all_shifts_that_day = generate_day_shifts(shifts_this_day, role, params, solver, trace, generation)
+
+    # Assign workers greedy
+    assignment = {} if trace else None
+    with trace_stage(trace, unit, "assign"):
+        assignments, not_covered = assign_greedy_workers(
+            all_shifts_that_day,
+            None,
+            params["max_weekly_hours"],
+            min_rest_hours_between_shifts=params["min_rest_hours_between_shifts"],
+            max_consecutive_days=params["max_consecutive_days"],
+            coverage_scope=coverage_scope,
+            worker_pool=worker_pool,
+            stats=assignment
+        )
+    if stats is not None:
+        stats["pruned_shifts"] = stats.get("pruned_shifts", 0) + generation.get("pruned", 0)
+    if trace:
+        trace.count(unit, "combinations", generation.get("combinations", 0))
+        trace.count(unit, "pricing_rounds", generation.get("pricing_rounds", 0))
+        trace.count(unit, "shifts_pruned", generation.get("pruned", 0))
+        trace.count(unit, "shifts_kept", len(all_shifts_that_day))
+        for name, n in assignment.items():
+            trace.count(unit, name, n)
+    return all_shifts_that_day, assignments, not_covered
+
+
+def generate_day_shifts(shifts_this_day, role, params, solver=None, trace=None, stats=None):
+    """
+    Clusters and valid pairings of one (role, airport, day) unit, without the dominated ones.
+    Depends only on the day's single shifts, the role, max_shift_duration and cluster_gap_minutes
+    (and the solver, if it generates other shifts than every valid pairing).
+    trace: optional PlanTrace, see plan_day. stats: optional dict, see generate_all_shifts_9h_for_role.
+    """
+    unit = (role, shifts_this_day[0]["airport"], shifts_this_day[0]["departure"].date()) if trace else None
+
+    with trace_stage(trace, unit, "cluster"):
+        inputs_for_generation = cluster_day_inputs(shifts_this_day, role, params["cluster_gap_minutes"])
+    if solver is not None:
+        with trace_stage(trace, unit, "generate"):
+            return solver.generate_shifts(inputs_for_generation, params, stats)
+
+    # Generate all valid pairings, dropping the dominated ones
+    with trace_stage(trace, unit, "generate"):
+        return generate_all_shifts_9h_for_role(
+            inputs_for_generation,
+            max_duration_hours=params["max_shift_duration"],
+            min_separation=params["cluster_gap_minutes"],
+            stats=stats,
+            prune=True
+        )
+
+
+def cluster_day_inputs(shifts_this_day, role, cluster_gap_minutes, all_candidate_clusters=None):
+    """
+    Inputs of the shift generation of one unit: indivisible cluster blocks, then the
+    single shifts not in a cluster. Cluster flights get a 'block_id' (the dictionaries
+    of shifts_this_day are updated). all_candidate_clusters: result of
+    find_all_valid_clusters for these shifts, if already computed.
+    """
+    cluster_blocks = []
+    cluster_flight_ids = set()
+
+    # Identify clusters
+    if role in {"SPV PAX", "CHECKIN", "SPV RAMP", "DRIV"}:
+        # Find candidate clusters
+        if all_candidate_clusters is None:
+            all_candidate_clusters = find_all_valid_clusters(shifts_this_day, role, cluster_gap_minutes)
+        # Select the best non-overlapping clusters
+        clusters = select_best_non_overlapping_clusters(all_candidate_clusters)
+        # For each cluster
+        for cluster in clusters:
+            # Generate shifts
+            bloques = generate_fixed_cluster_shifts(cluster)
+            cluster_blocks.extend(bloques)
+            # Flights already covered
+            for bloque in bloques:
+                cluster_flight_ids.update(f["flight_id"] for f in bloque["flights"])
+
+    # Remaining shifts
+    remaining_shifts = [s for s in shifts_this_day if s["flight_id"] not in cluster_flight_ids]
+
+    # Combine
+    return cluster_blocks + remaining_shifts
+
+
+def plan_partition(buckets, roles, airport, params, shift_cache=None, previous_units=None, day_shifts=None,
+                   solver=None, trace=None):
+    """
+    Plans every day of the given roles at one airport, in order.
+    buckets: single shifts by (role, airport, day), see partition_single_shifts.
+    The roles of a partition share worker IDs (same airport and role prefix), so they
+    share one worker pool; different partitions never share workers.
+
+    previous_units: units of a previous plan of this partition, see plan_units; if given,
+    a unit is only planned again if its inputs changed or the worker state it starts
+    from differs from the previous run's (replayed from its assignments). Otherwise the
+    previous assignments are kept, which is what planning it again would give.
+    day_shifts: shifts already generated by (role, airport, day) for these params
+    (e.g. shared by the runs of a sweep); generation is skipped for those units.
+    solver: optional solver (see functions.solvers) generating the shifts of each unit and
+    re-assigning the shifts of the whole partition after the greedy pass; the worker state
+    is then rebuilt from its assignments.
+    trace: optional PlanTrace (see plan_day); the solver is timed as the unit
+    (roles joined by '+', airport, None).
+
+    Returns the units {(role, airport): [(day, digest, shifts, assignments, not_covered), ...]}
+    and the worker tracking structures of the partition, with the shift cache hits/misses
+    and the number of reused and re-planned units, the dominated shifts pruned and the trace.
+    """
+    worker_pool = WorkerPool()
+    cache_counts = (shift_cache.hits, shift_cache.misses) if shift_cache else (0, 0)
+    prefix = worker_prefix(roles[0])
+
+    # State of the previous plan, unit by unit
+    previous_pool = WorkerPool() if previous_units is not None else None
+    in_sync = True
+    reused = replanned = 0
+    stats = {"pruned_shifts": 0}
+
+    units = {}
+    for role in roles:
+        # Get days
+        days_in_airport = {day for (r, apt, day) in buckets if r == role and apt == airport}
+        if previous_units is not None:
+            days_in_airport |= {day for (r, apt, day) in previous_units if r == role and apt == airport}
+        day_results = []
+        for day in sorted(days_in_airport):
+            shifts_this_day = buckets.get((role, airport, day))
+            previous = previous_units.get((role, airport, day)) if previous_units is not None else None
+            digest = unit_digest(shifts_this_day) if shifts_this_day else None
+            unchanged = previous is not None and previous["digest"] == digest
+
+            if shifts_this_day:
+                # Flights this role must cover that day
+                coverage_scope = {s["flight_id"] for s in shifts_this_day}
+                if unchanged and in_sync:
+                    shifts, assignments = previous["shifts"], previous["assignments"]
+                    with trace_stage(trace, (role, airport, day), "replay"):
+                        replay_assignments(worker_pool, assignments)
+                    not_covered = coverage_scope - {fid for a in assignments for fid in a["shift"]["flights"]}
+                    reused += 1
+                else:
+                    generated = previous["shifts"] if unchanged and previous["shifts"] else None
+                    if generated is None and day_shifts is not None:
+                        generated = day_shifts.get((role, airport, day))
+                    shifts, assignments, not_covered = plan_day(
+                        shifts_this_day, role, worker_pool, coverage_scope, params, shift_cache, generated, solver, trace,
+                        stats
+                    )
+                    replanned += 1
+                day_results.append((day, digest, shifts, assignments, not_covered))
+
+            if previous_units is not None:
+                if previous is not None:
+                    replay_assignments(previous_pool, previous["assignments"])
+                if not (unchanged and in_sync):
+                    in_sync = worker_pool.group_state(airport, prefix) == previous_pool.group_state(airport, prefix)
+        units[(role, airport)] = day_results
+
+    report = None
+    if solver is not None:
+        with trace_stage(trace, ("+".join(roles), airport, None), "solve"):
+            solved, report = solver.solve(units, airport, prefix, params)
+        if solved is not units:
+            units = solved
+            worker_pool = WorkerPool()
+            replay_assignments(worker_pool, sorted(
+                (a for day_results in units.values() for unit in day_results for a in unit[3]),
+                key=lambda a: a["shift"]["start"]
+            ))
+
+    state = {
+        "existing_workers": worker_pool.existing_workers,
+        "hour_counter": worker_pool.hour_counter,
+        "last_shift_end_time": worker_pool.last_shift_end_time,
+        "streak_tracker": worker_pool.streak_tracker,
+        "shift_cache": {
+            "hits": shift_cache.hits - cache_counts[0] if shift_cache else 0,
+            "misses": shift_cache.misses - cache_counts[1] if shift_cache else 0,
+        },
+        "incremental": {"reused": reused, "replanned": replanned},
+        "pruned_shifts": stats["pruned_shifts"],
+        "solver": report,
+        "trace": trace,
+    }
+    return units, state
+
+
+def replay_assignments(worker_pool, assignments):
+    """
+    Registers already made assignments in a worker pool, in order.
+    """
+    for a in assignments:
+        sh = a["shift"]
+        worker_pool.replay_shift(sh["airport"], worker_prefix(sh["role"]), a["worker_id"],
+                                 sh["start"], sh["end"], sh["duration_hours"])
+
+
+def unit_digest(shifts_this_day):
+    """
+    SHA-256 of the inputs of a (role, airport, day) unit: its single shifts, in order.
+    """
+    digest = hashlib.sha256()
+    for s in shifts_this_day:
+        digest.update(f"{s['flight_id']}|{s['start']}|{s['end']}|{s['departure']}\n".encode())
+    return digest.hexdigest()
+
+
+def plan_units(plan):
+    """
+    Units of a plan by (role, airport, day): digest, shifts (empty if the plan did not
+    keep them) and assignments, sliced from all_shifts/all_assignments with the counts
+    in plan['units'].
+    """
+    units = {}
+    shift_pos = assignment_pos = 0
+    for role, airport, day, digest, shift_rows, assignment_rows in plan["units"]:
+        units[(role, airport, day)] = {
+            "digest": digest,
+            "shifts": plan["all_shifts"][shift_pos:shift_pos + shift_rows],
+            "assignments": plan["all_assignments"][assignment_pos:assignment_pos + assignment_rows],
+        }
+        shift_pos += shift_rows
+        assignment_pos += assignment_rows
+    return units
+
+
+def run_planning(flights, roles, params, workers=1, on_unit=None, shift_cache=None, previous=None,
+                 buckets=None, day_shifts=None, solver=None, trace=None):
+    """
+    Plans all (role, airport, day) units.
+    (role, airport) partitions are independent, so with workers > 1 they run in a process
+    pool; days inside a partition always run in order to keep the weekly hours, rest and
+    streak constraints. Results are merged in role → airport → day order, exactly as a
+    serial run.
+
+    params: max_shift_duration, cluster_gap_minutes, max_weekly_hours,
+            min_rest_hours_between_shifts, max_consecutive_days
+    on_unit(role, airport, day, shifts, not_covered) is called for each unit, in order.
+    shift_cache: optional ShiftCache for the per-day shift generation.
+    previous: a previous plan (e.g. load_plan) to re-plan incrementally: only units whose
+    flights changed, and the later units of the same partition until the worker state is
+    back to the previous one, are planned again (see plan_partition). The result is the
+    same as a full run. Ignored if it was made with other params or roles.
+    buckets: single shifts already partitioned (partition_single_shifts(flights)); flights
+    is then not needed. day_shifts: shifts already generated per unit, see plan_partition.
+    solver: e.g. make_solver("milp"), re-assigns each partition after the greedy pass
+    (greedy only if None); previous is then ignored, as its units depend on each other.
+    trace: optional PlanTrace, filled with the stage times and counters of every unit
+    (each partition is traced separately and merged, also from planner processes).
+
+    Returns a dict with all_shifts, all_assignments, shift_count, existing_workers,
+    hour_counter, last_shift_end_time, streak_tracker, shift_cache (hits and misses),
+    incremental (reused and re-planned units), pruned_shifts (dominated shifts dropped),
+    solver (report of each partition solve), units (role, airport, day, input digest,
+    shifts kept and assignments of each unit, in order), params and roles.
+    """
+    if buckets is None:
+        buckets = partition_single_shifts(flights)
+
+    # Get unique airports
+    unique_airports = sorted({airport for (_, airport, _) in buckets})
+
+    # Partitions: roles sharing airport and worker ID prefix
+    partitions = defaultdict(list)
+    for role in roles:
+        for airport in unique_airports:
+            partitions[(airport, worker_prefix(role))].append(role)
+
+    # Single shifts by (role, airport, day), split by partition
+    partition_buckets = defaultdict(dict)
+    for (role, airport, day), bucket in buckets.items():
+        partition_buckets[(airport, worker_prefix(role))][(role, airport, day)] = bucket
+
+    # Units of the previous plan, split by partition
+    partition_previous = None
+    if (previous is not None and previous.get("params") == params and previous.get("roles") == list(roles)
+            and (solver is None or solver.name == "greedy")):
+        partition_previous = defaultdict(dict)
+        for (role, airport, day), unit in plan_units(previous).items():
+            partition_previous[(airport, worker_prefix(role))][(role, airport, day)] = unit
+
+    # Initialize global lists and tracking structures
+    result = {
+        "all_shifts": [],
+        "all_assignments": [],
+        "shift_count": 0,
+        "existing_workers": set(),            # Set of already created worker IDs
+        "hour_counter": defaultdict(float),   # Tracks worked hours per worker per natural week
+        "last_shift_end_time": {},            # Last shift end time per worker
+        "streak_tracker": {},                 # Tracks streaks of consecutive working days per worker
+        "shift_cache": {"hits": 0, "misses": 0},
+        "incremental": {"reused": 0, "replanned": 0},
+        "pruned_shifts": 0,
+        "solver": [],
+        "units": [],
+        "params": dict(params),
+        "roles": list(roles),
+    }
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        pending = {}
+        for (airport, prefix), partition_roles in partitions.items():
+            args = (
+                partition_buckets[(airport, prefix)], partition_roles, airport, params, shift_cache,
+                partition_previous.get((airport, prefix), {}) if partition_previous is not None else None,
+                day_shifts, solver, PlanTrace(trace.memory) if trace is not None else None
+            )
+            pending[(airport, prefix)] = executor.submit(plan_partition, *args) if executor else args
+
+        results = {}
+        for role in roles:
+            for airport in unique_airports:
+                key = (airport, worker_prefix(role))
+                if key not in results:
+                    job = pending[key]
+                    results[key] = job.result() if executor else plan_partition(*job)
+                    units, state = results[key]
+                    result["existing_workers"].update(state["existing_workers"])
+                    result["hour_counter"].update(state["hour_counter"])
+                    result["last_shift_end_time"].update(state["last_shift_end_time"])
+                    result["streak_tracker"].update(state["streak_tracker"])
+                    for counter, count in state["shift_cache"].items():
+                        result["shift_cache"][counter] += count
+                    for counter, count in state["incremental"].items():
+                        result["incremental"][counter] += count
+                    result["pruned_shifts"] += state["pruned_shifts"]
+                    if state["solver"]:
+                        result["solver"].append(state["solver"])
+                    if trace is not None:
+                        trace.merge(state["trace"])
+                units, _ = results[key]
+
+                for day, digest, shifts, assignments, not_covered in units[(role, airport)]:
+                    if on_unit:
+                        on_unit(role, airport, day, shifts, not_covered)
+                    result["all_shifts"].extend(shifts) # All shifts (across all roles, days, and airports)
+                    result["all_assignments"].extend(assignments)
+                    result["shift_count"] += len(shifts)
+                    result["units"].append((role, airport, day, digest, len(shifts), len(assignments)))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return result
+
+
+def run_planning_stream(day_batches, roles, params, on_unit=None, keep_shifts=False, shift_cache=None, trace=None):
+    """
+    Plans a schedule given as a stream of (airport, day, flights) batches, sorted by
+    (airport, day) (see stream_flight_days), so only one day of flights is in memory.
+    Worker state is kept across days; each (role, airport) still sees its days in order,
+    so when every role has its own worker ID prefix (as the roles of ROLE_PREFIX do) the
+    assignments are the same as run_planning's, listed airport → day → role. Roles sharing
+    a prefix share their workers, and are planned day by day here but role by role in
+    run_planning, so their assignments may differ.
+    The generated shifts are only counted (and passed to on_unit) unless keep_shifts.
+    trace: optional PlanTrace, see plan_day.
+
+    Returns the same dict as run_planning.
+    """
+    worker_pool = WorkerPool()
+    result = {
+        "all_shifts": [],
+        "all_assignments": [],
+        "shift_count": 0,
+        "existing_workers": worker_pool.existing_workers,
+        "hour_counter": worker_pool.hour_counter,
+        "last_shift_end_time": worker_pool.last_shift_end_time,
+        "streak_tracker": worker_pool.streak_tracker,
+        "shift_cache": {"hits": 0, "misses": 0},
+        "incremental": {"reused": 0, "replanned": 0},
+        "pruned_shifts": 0,
+        "solver": [],
+        "units": [],
+        "params": dict(params),
+        "roles": list(roles),
+    }
+    cache_counts = (shift_cache.hits, shift_cache.misses) if shift_cache else (0, 0)
+
+    for airport, day, flights in day_batches:
+        buckets = partition_single_shifts(flights)
+        for role in roles:
+            shifts_this_day = buckets.get((role, airport, day))
+            if not shifts_this_day:
+                continue
+            # Flights this role must cover that day
+            coverage_scope = {s["flight_id"] for s in shifts_this_day}
+            shifts, assignments, not_covered = plan_day(shifts_this_day, role, worker_pool, coverage_scope, params, shift_cache,
+                                                        trace=trace, stats=result)
+            if on_unit:
+                on_unit(role, airport, day, shifts, not_covered)
+            if keep_shifts:
+                result["all_shifts"].extend(shifts)
+            result["all_assignments"].extend(assignments)
+            result["shift_count"] += len(shifts)
+            result["units"].append((role, airport, day, unit_digest(shifts_this_day),
+                                    len(shifts) if keep_shifts else 0, len(assignments)))
+            result["incremental"]["replanned"] += 1
+
+    if shift_cache:
+        result["shift_cache"] = {"hits": shift_cache.hits - cache_counts[0], "misses": shift_cache.misses - cache_counts[1]}
+    return result
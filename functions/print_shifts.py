@@ -1,9 +1,6 @@
 from tabulate import tabulate
 import numpy as np
 from collections import defaultdict
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
 from datetime import datetime
 import textwrap
 
@@ -107,7 +104,30 @@ def print_worker_assignments(assignments):
             print(tabulate(rows, headers="keys", tablefmt="fancy_grid", stralign="center"))
 
 
-def export_assignments_to_pdf(assignments, output_path="Worker_Assignments.pdf"):
+def export_assignments_to_pdf(assignments, output_path="Worker_Assignments.pdf", workers=1):
+    from functions.pdf_render import render_pages_to_pdf
+
+    grouped = defaultdict(lambda: defaultdict(list))
+    for a in assignments:
+        sh = a["shift"]
+        day = sh["start"].strftime("%Y-%m-%d")
+        apt = sh["airport"]
+        grouped[day][apt].append(a)
+
+    # One page per (day, airport)
+    pages = [(day, apt, grouped[day][apt]) for day in sorted(grouped) for apt in sorted(grouped[day])]
+    render_pages_to_pdf(_draw_assignments_page, pages, output_path, workers)
+
+    print(f"📄 PDF exportado correctamente como: {output_path}")
+
+
+def _draw_assignments_page(day, apt, apt_assignments):
+    """
+    Draws the assignment tables (passenger and ramp shifts) of one (day, airport).
+    """
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
     def wrap_flight_text(flights, max_line_length=40):
         return textwrap.fill(", ".join(flights), width=max_line_length)
 
@@ -125,110 +145,97 @@ def export_assignments_to_pdf(assignments, output_path="Worker_Assignments.pdf")
         "OPE_B": "#80cfa9",
     }
 
-    grouped = defaultdict(lambda: defaultdict(list))
-    for a in assignments:
-        sh = a["shift"]
-        day = sh["start"].strftime("%Y-%m-%d")
-        apt = sh["airport"]
-        grouped[day][apt].append(a)
+    day_obj = datetime.strptime(day, "%Y-%m-%d")
+    weekday_name = day_obj.strftime("%A")
+
+    # Separar asignaciones por grupo de rol
+    pax_rows = []
+    ramp_rows = []
+
+    for a in apt_assignments:
+        sh = a['shift']
+        row = {
+            "Worker": a['worker_id'],
+            "Role": sh['role'],
+            "Flights": wrap_flight_text(sh['flights']),
+            "S1": sh['start_1'].strftime("%H:%M") if sh.get("start_1") else "",
+            "E1": sh['end_1'].strftime("%H:%M") if sh.get("start_1") else "",
+            "S2": sh['start_2'].strftime("%H:%M") if sh.get("start_2") else "",
+            "E2": sh['end_2'].strftime("%H:%M") if sh.get("start_2") else "",
+            "Dur(h)": round(sh['duration_hours'], 2),
+            "Split": "true" if sh.get("split", False) else "false",
+        }
+        if sh["role"] in pax_roles:
+            pax_rows.append(row)
+        elif sh["role"] in ramp_roles:
+            ramp_rows.append(row)
+
+    df_pax = pd.DataFrame(pax_rows)
+    df_ramp = pd.DataFrame(ramp_rows)
+    total_rows = len(df_pax) + len(df_ramp)
+    fig_height = 0.5 * total_rows + 3
+
+    fig, ax = plt.subplots(figsize=(14, fig_height))
+    fig.subplots_adjust(left=0.03, right=0.97, top=0.9, bottom=0.1)
+    ax.axis("off")
+    ax.set_title(f"{apt} // {day} ({weekday_name})", fontsize=16, fontweight='bold', y=1.02)
+
+    y_offset = 1.0
+    cell_height = 1.0 / (total_rows + 6)
+
+    def draw_table(df, label):
+        nonlocal y_offset
+        if df.empty:
+            return
+
+        # Título de bloque como tabla
+        title_table = ax.table(
+            cellText=[[label]],
+            colLabels=None,
+            loc='upper left',
+            bbox=[0, y_offset - cell_height * 1.2, 1, cell_height * 1.2]
+        )
+        title_table.auto_set_font_size(False)
+        title_table.set_fontsize(11)
+        title_cell = title_table[0, 0]
+        title_cell.set_text_props(fontweight='bold', ha='center', va='center')
+        title_cell.visible_edges = "open"
+        title_cell.set_facecolor("#e0e0e0")
+
+        y_offset -= cell_height * 1.5
+
+        table = ax.table(
+            cellText=df.values,
+            colLabels=df.columns,
+            cellLoc='center',
+            loc='upper left',
+            bbox=[0, y_offset - cell_height * (len(df) + 1), 1, cell_height * (len(df) + 1)]
+        )
 
-    with PdfPages(output_path) as pdf:
-        for day in sorted(grouped):
-            day_obj = datetime.strptime(day, "%Y-%m-%d")
-            weekday_name = day_obj.strftime("%A")
-            for apt in sorted(grouped[day]):
-
-                # Separar asignaciones por grupo de rol
-                pax_rows = []
-                ramp_rows = []
-
-                for a in grouped[day][apt]:
-                    sh = a['shift']
-                    row = {
-                        "Worker": a['worker_id'],
-                        "Role": sh['role'],
-                        "Flights": wrap_flight_text(sh['flights']),
-                        "S1": sh['start_1'].strftime("%H:%M") if sh.get("start_1") else "",
-                        "E1": sh['end_1'].strftime("%H:%M") if sh.get("start_1") else "",
-                        "S2": sh['start_2'].strftime("%H:%M") if sh.get("start_2") else "",
-                        "E2": sh['end_2'].strftime("%H:%M") if sh.get("start_2") else "",
-                        "Dur(h)": round(sh['duration_hours'], 2),
-                        "Split": "true" if sh.get("split", False) else "false",
-                    }
-                    if sh["role"] in pax_roles:
-                        pax_rows.append(row)
-                    elif sh["role"] in ramp_roles:
-                        ramp_rows.append(row)
-
-                df_pax = pd.DataFrame(pax_rows)
-                df_ramp = pd.DataFrame(ramp_rows)
-                total_rows = len(df_pax) + len(df_ramp)
-                fig_height = 0.5 * total_rows + 3
-
-                fig, ax = plt.subplots(figsize=(14, fig_height))
-                fig.subplots_adjust(left=0.03, right=0.97, top=0.9, bottom=0.1)
-                ax.axis("off")
-                ax.set_title(f"{apt} // {day} ({weekday_name})", fontsize=16, fontweight='bold', y=1.02)
-
-                y_offset = 1.0
-                cell_height = 1.0 / (total_rows + 6)
-
-                def draw_table(df, label):
-                    nonlocal y_offset
-                    if df.empty:
-                        return
-
-                    # Título de bloque como tabla
-                    title_table = ax.table(
-                        cellText=[[label]],
-                        colLabels=None,
-                        loc='upper left',
-                        bbox=[0, y_offset - cell_height * 1.2, 1, cell_height * 1.2]
-                    )
-                    title_table.auto_set_font_size(False)
-                    title_table.set_fontsize(11)
-                    title_cell = title_table[0, 0]
-                    title_cell.set_text_props(fontweight='bold', ha='center', va='center')
-                    title_cell.visible_edges = "open"
-                    title_cell.set_facecolor("#e0e0e0")
-
-                    y_offset -= cell_height * 1.5
-
-                    table = ax.table(
-                        cellText=df.values,
-                        colLabels=df.columns,
-                        cellLoc='center',
-                        loc='upper left',
-                        bbox=[0, y_offset - cell_height * (len(df) + 1), 1, cell_height * (len(df) + 1)]
-                    )
-
-                    flights_col_idx = df.columns.get_loc("Flights")
-                    role_col_idx = df.columns.get_loc("Role")
-
-                    for key, cell in table.get_celld().items():
-                        row_idx, col_idx = key
-
-                        # Ajuste de anchos
-                        if col_idx == flights_col_idx:
-                            cell.set_width(0.45)
-                            cell.set_text_props(ha='left', va='center')
-                        else:
-                            cell.set_width(0.06)
-
-                        # Pintar fondo en columna "Role"
-                        if row_idx > 0 and col_idx == role_col_idx:
-                            role_value = df.iloc[row_idx - 1]["Role"]
-                            color = role_colors.get(role_value, "#ffffff")
-                            cell.set_facecolor(color)
-
-                    table.auto_set_font_size(False)
-                    table.set_fontsize(8)
-                    y_offset -= cell_height * (len(df) + 2)
-
-                draw_table(df_pax, "TURNO PASAJEROS")
-                draw_table(df_ramp, "TURNO RAMPA")
-
-                pdf.savefig(fig)
-                plt.close(fig)
+        flights_col_idx = df.columns.get_loc("Flights")
+        role_col_idx = df.columns.get_loc("Role")
 
-    print(f"📄 PDF exportado correctamente como: {output_path}")
+        for key, cell in table.get_celld().items():
+            row_idx, col_idx = key
+
+            # Ajuste de anchos
+            if col_idx == flights_col_idx:
+                cell.set_width(0.45)
+                cell.set_text_props(ha='left', va='center')
+            else:
+                cell.set_width(0.06)
+
+            # Pintar fondo en columna "Role"
+            if row_idx > 0 and col_idx == role_col_idx:
+                role_value = df.iloc[row_idx - 1]["Role"]
+                color = role_colors.get(role_value, "#ffffff")
+                cell.set_facecolor(color)
+
+        table.auto_set_font_size(False)
+        table.set_fontsize(8)
+        y_offset -= cell_height * (len(df) + 2)
+
+    draw_table(df_pax, "TURNO PASAJEROS")
+    draw_table(df_ramp, "TURNO RAMPA")
+
+    return fig
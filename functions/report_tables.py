@@ -0,0 +1,168 @@
+import csv
+import os
+from collections import defaultdict
+from datetime import datetime
+from html import escape
+
+from functions.hours_summary import build_worker_hours_summary_by_airport
+
+# Same grouping and colours as the PDF table export (print_shifts.export_assignments_to_pdf)
+PAX_ROLES = {"SPV PAX", "CHECKIN", "AG PAX", "COORDI"}
+RAMP_ROLES = {"SPV RAMP", "DRIV", "OPE_A", "OPE_B"}
+ROLE_COLORS = {
+    "SPV PAX": "#e63946",
+    "CHECKIN": "#f4a261",
+    "AG PAX": "#80cfa9",
+    "COORDI": "#8fbcd4",
+    "SPV RAMP": "#e63946",
+    "DRIV": "#f4a261",
+    "OPE_A": "#80cfa9",
+    "OPE_B": "#80cfa9",
+}
+REPORT_FORMATS = {"html", "csv"}
+
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; font-size: 12px; }}
+table {{ border-collapse: collapse; margin-bottom: 16px; }}
+th, td {{ border: 1px solid #999; padding: 2px 6px; text-align: center; }}
+th.block {{ background: #e0e0e0; font-size: 13px; }}
+td.flights {{ text-align: left; }}
+</style>
+</head>
+<body>
+"""
+HTML_TAIL = "</body>\n</html>\n"
+
+
+def export_assignments_report(assignments, output_path, fmt="html"):
+    """
+    Writes the assignment tables of export_assignments_to_pdf as HTML or CSV, without matplotlib.
+    One section per day and airport, with passenger and ramp shifts in separate blocks;
+    in HTML the Role cells keep the role colours. The extension of output_path is set to fmt.
+    Rows are written as they are produced.
+    """
+    assert fmt in REPORT_FORMATS
+    output_path = f"{os.path.splitext(output_path)[0]}.{fmt}"
+
+    grouped = defaultdict(lambda: defaultdict(list))
+    for a in assignments:
+        sh = a["shift"]
+        day = sh["start"].strftime("%Y-%m-%d")
+        apt = sh["airport"]
+        grouped[day][apt].append(a)
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["Day", "Airport", "Block", "Worker", "Role", "Flights", "S1", "E1", "S2", "E2", "Dur(h)", "Split"])
+        else:
+            f.write(HTML_HEAD.format(title="Worker Assignments"))
+
+        for day in sorted(grouped):
+            weekday_name = datetime.strptime(day, "%Y-%m-%d").strftime("%A")
+            for apt in sorted(grouped[day]):
+                pax_rows, ramp_rows = split_assignment_rows(grouped[day][apt])
+
+                if fmt == "csv":
+                    for label, rows in (("PAX", pax_rows), ("RAMP", ramp_rows)):
+                        for row in rows:
+                            writer.writerow([day, apt, label, *row.values()])
+                    continue
+
+                f.write(f"<h2>{escape(apt)} // {day} ({weekday_name})</h2>\n")
+                for label, rows in (("TURNO PASAJEROS", pax_rows), ("TURNO RAMPA", ramp_rows)):
+                    if not rows:
+                        continue
+                    f.write("<table>\n")
+                    f.write(f'<tr><th class="block" colspan="{len(rows[0])}">{label}</th></tr>\n')
+                    f.write("<tr>" + "".join(f"<th>{escape(k)}</th>" for k in rows[0]) + "</tr>\n")
+                    for row in rows:
+                        cells = []
+                        for key, value in row.items():
+                            if key == "Role":
+                                cells.append(f'<td style="background:{ROLE_COLORS.get(value, "#ffffff")}">{escape(value)}</td>')
+                            elif key == "Flights":
+                                cells.append(f'<td class="flights">{escape(value)}</td>')
+                            else:
+                                cells.append(f"<td>{escape(str(value))}</td>")
+                        f.write("<tr>" + "".join(cells) + "</tr>\n")
+                    f.write("</table>\n")
+
+        if fmt == "html":
+            f.write(HTML_TAIL)
+
+    print(f"📄 Informe exportado correctamente como: {output_path}")
+    return output_path
+
+
+def export_worker_hours_report(hour_counter, output_path, fmt="html"):
+    """
+    Writes the weekly hours summary of export_worker_hours_summary_to_pdf as HTML or CSV,
+    one table per week and airport. The extension of output_path is set to fmt.
+    """
+    assert fmt in REPORT_FORMATS
+    output_path = f"{os.path.splitext(output_path)[0]}.{fmt}"
+    summary = build_worker_hours_summary_by_airport(hour_counter)
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(["Week", "Airport", "Worker ID", "Role", "Hours Worked"])
+        else:
+            f.write(HTML_HEAD.format(title="Worker Hours Summary"))
+
+        for week_range in sorted(summary.keys()):
+            for airport in sorted(summary[week_range].keys()):
+                rows = summary[week_range][airport]
+                if fmt == "csv":
+                    for row in rows:
+                        writer.writerow([week_range, airport, row["Worker ID"], row["Role"], row["Hours Worked"]])
+                    continue
+
+                f.write(f"<h2>Airport: {escape(airport)}  //  Week: {escape(week_range)}</h2>\n")
+                f.write("<table>\n<tr><th>Worker ID</th><th>Role</th><th>Hours Worked</th></tr>\n")
+                for row in rows:
+                    f.write(
+                        f"<tr><td>{escape(row['Worker ID'])}</td>"
+                        f'<td style="background:{ROLE_COLORS.get(row["Role"], "#ffffff")}">{escape(row["Role"])}</td>'
+                        f"<td>{row['Hours Worked']}</td></tr>\n"
+                    )
+                f.write("</table>\n")
+
+        if fmt == "html":
+            f.write(HTML_TAIL)
+
+    print(f"Summary exported to: {output_path}")
+    return output_path
+
+
+def split_assignment_rows(assignments):
+    """
+    Rows of the assignment table (same columns as the PDF export), split into
+    passenger and ramp shifts. Returns (pax_rows, ramp_rows).
+    """
+    pax_rows = []
+    ramp_rows = []
+    for a in assignments:
+        sh = a['shift']
+        row = {
+            "Worker": a['worker_id'],
+            "Role": sh['role'],
+            "Flights": ", ".join(sh['flights']),
+            "S1": sh['start_1'].strftime("%H:%M") if sh.get("start_1") else "",
+            "E1": sh['end_1'].strftime("%H:%M") if sh.get("start_1") else "",
+            "S2": sh['start_2'].strftime("%H:%M") if sh.get("start_2") else "",
+            "E2": sh['end_2'].strftime("%H:%M") if sh.get("start_2") else "",
+            "Dur(h)": round(sh['duration_hours'], 2),
+            "Split": "true" if sh.get("split", False) else "false",
+        }
+        if sh["role"] in PAX_ROLES:
+            pax_rows.append(row)
+        elif sh["role"] in RAMP_ROLES:
+            ramp_rows.append(row)
+    return pax_rows, ramp_rows
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+# Bump when clustering or shift generation change what they return
+SHIFT_CACHE_VERSION = "2"
+
+SHIFT_TIMES = ("start", "end", "start_1", "end_1", "start_2", "end_2")
+MICROSECOND = timedelta(microseconds=1)
+
+
+class ShiftCache:
+    """
+    Disk-backed cache of the shifts generated for one (role, airport, day).
+
+    The clustering pass and generate_all_shifts_9h_for_role only depend on the single
+    shifts of the day and on max_shift_duration / cluster_gap_minutes, so results are
+    keyed by a hash of those inputs with times relative to the day's midnight and flight
+    IDs replaced by their position. The same weekly pattern on another date, or with other
+    flight IDs, reuses the stored shifts re-anchored to the new day and flights.
+
+    Entries live in a SQLite file; when they exceed max_bytes the least recently used
+    are evicted. hits/misses count the lookups of this object (per process).
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+
+    def __getstate__(self):
+        # Sent to planner processes without the open connection
+        state = self.__dict__.copy()
+        state["_db"] = None
+        return state
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=60)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS shifts (key TEXT PRIMARY KEY, value TEXT, size INTEGER, used INTEGER)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS shifts_used ON shifts (used)")
+        return self._db
+
+    def key(self, shifts_this_day, role, params):
+        """
+        Hash of the normalized day inputs.
+        """
+        anchor = day_anchor(shifts_this_day)
+        first_position = {}
+        inputs = [
+            (
+                offset(s["start"], anchor), offset(s["end"], anchor), offset(s["departure"], anchor),
+                first_position.setdefault(s["flight_id"], i) # Repeated IDs change the result
+            )
+            for i, s in enumerate(shifts_this_day)
+        ]
+        normalized = [SHIFT_CACHE_VERSION, role, params["max_shift_duration"], params["cluster_gap_minutes"], inputs]
+        return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+    def get(self, key, shifts_this_day):
+        """
+        Stored shifts for key, rebuilt with the dates and flights of shifts_this_day; None on a miss.
+        """
+        row = self.db.execute("SELECT value FROM shifts WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self.db:
+            self.db.execute("UPDATE shifts SET used = (SELECT COALESCE(MAX(used), 0) + 1 FROM shifts) WHERE key = ?", (key,))
+
+        anchor = day_anchor(shifts_this_day)
+        flight_ids = [s["flight_id"] for s in shifts_this_day]
+        role = shifts_this_day[0]["role"]
+        airport = shifts_this_day[0]["airport"]
+        shifts = []
+        for positions, duration, split, times in json.loads(row[0]):
+            shift = {
+                'flights': [flight_ids[p] for p in positions],
+                'role': role,
+                'airport': airport,
+                'duration_hours': duration,
+                'split': split,
+            }
+            for name, value in zip(SHIFT_TIMES, times):
+                shift[name] = anchor + value * MICROSECOND if value is not None else None
+            # Same key order as build_shift_object
+            shifts.append({k: shift[k] for k in (
+                'flights', 'role', 'airport', 'start', 'end', 'duration_hours', 'split',
+                'start_1', 'end_1', 'start_2', 'end_2'
+            )})
+        return shifts
+
+    def put(self, key, shifts_this_day, shifts):
+        """
+        Stores the shifts generated from shifts_this_day under key and evicts old entries if needed.
+        """
+        anchor = day_anchor(shifts_this_day)
+        position = {}
+        for i, s in enumerate(shifts_this_day):
+            position.setdefault(s["flight_id"], i)
+        value = json.dumps([
+            [
+                [position[fid] for fid in sh["flights"]],
+                sh["duration_hours"],
+                sh["split"],
+                [offset(sh[name], anchor) if sh[name] is not None else None for name in SHIFT_TIMES],
+            ]
+            for sh in shifts
+        ], separators=(",", ":"))
+
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO shifts VALUES (?, ?, ?, (SELECT COALESCE(MAX(used), 0) + 1 FROM shifts))",
+                (key, value, len(value))
+            )
+            # Least recently used first
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM shifts").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, size in self.db.execute("SELECT key, size FROM shifts ORDER BY used").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self.db.execute("DELETE FROM shifts WHERE key = ?", (old_key,))
+                    total -= size
+
+
+def day_anchor(shifts_this_day):
+    """
+    Midnight of the day of a (role, airport, day) unit.
+    """
+    return datetime.combine(shifts_this_day[0]["departure"].date(), datetime.min.time())
+
+
+def offset(t, anchor):
+    """
+    Microseconds from anchor to t.
+    """
+    return (t - anchor) // MICROSECOND
@@ -1,5 +1,7 @@
 from itertools import combinations
-from collections import deque
+from collections import deque, defaultdict
+
+import numpy as np
 
 def generate_single_shifts(flights, role_filter=None, airport_filter=None):
     """
@@ -32,17 +34,48 @@ def generate_single_shifts(flights, role_filter=None, airport_filter=None):
 
     return single_shifts
 
+def partition_single_shifts(flights):
+    """
+    Generates the single shifts of all flights in one pass, grouped by (role, airport, day).
+    Each bucket keeps the order of the flights list, as generate_single_shifts does.
+    Returns a dict (role, airport, date) → list of single shifts.
+    """
+    buckets = defaultdict(list)
+
+    for f in flights:
+        day = f["departure"].date()
+        # Iterate through required roles
+        for role, times in f["workers"].items():
+            buckets[(role, f["airport"], day)].append({
+                'flight_id': f['id'],
+                'role': role,
+                'airport': f['airport'],
+                'start': times['start'],
+                'end': times['end'],
+                'departure': f['departure']
+            })
+
+    return dict(buckets)
+
 #################################################
 
-def generate_all_shifts_9h_for_role(shifts_same_role, max_duration_hours, min_separation):
+def generate_all_shifts_9h_for_role(shifts_same_role, max_duration_hours, min_separation, exhaustive=False, stats=None,
+                                    prune=False):
     """
     Generates all valid shift combinations (max 9h) using both individual flights and indivisible blocks.
     Conditions:
       - No repeated flights in a shift
       - Max shift duration
       - Minimum time gap between consecutive flights
+
+    By default the combinations are built incrementally (see extend_shifts_in_order), so
+    only partial shifts that can still become valid are explored. exhaustive=True runs the
+    original power-set enumerator instead; both return the same shifts in the same order.
+    prune: drop the dominated shifts (see prune_dominated_shifts); only the incremental
+    enumerator prunes, the exhaustive one returns every valid shift.
+    stats: optional dict, gets the number of candidate combinations examined ('combinations')
+    and of shifts pruned ('pruned').
     """
-    all_valid_shifts = []
     items = []
 
     # Normalize inputs
@@ -52,6 +85,257 @@ def generate_all_shifts_9h_for_role(shifts_same_role, max_duration_hours, min_se
         else:
             items.append([item]) # One flight case
 
+    # A flight shared by two items makes the first-seen combination depend on the power-set order
+    all_ids = [f["flight_id"] for block in items for f in block]
+    if exhaustive or len(all_ids) != len(set(all_ids)):
+        return generate_all_shifts_exhaustive(items, max_duration_hours, min_separation, stats)
+
+    return extend_shifts_in_order(items, max_duration_hours, min_separation, stats, prune)
+
+
+class DayCompatibility:
+    """
+    Flight compatibility of the items of one (role, airport, day), precomputed with NumPy
+    so the shift enumerator reads pairs from tables instead of re-sorting flights and
+    subtracting datetimes for every candidate combination.
+
+    Flights get a rank by departure, ties in input order (as the stable sorts of
+    consecutive_pairs_ok and build_shift_object), so the sorted ranks of any combination
+    are its flights in departure order. By rank:
+      - flights, departure / start / end (microseconds since the epoch)
+      - follows[a][b]: b can come right after a in a shift: same block, or departures
+        more than min_separation minutes apart
+      - split[a][b]: the gap from the end of a to the start of b (gap_minutes[a][b])
+        is a split break, 60 to 300 minutes
+    item_ranks[i]: ranks of the flights of item i (block membership).
+    Times and durations are computed with the same float operations as the datetime
+    code, so the shifts are identical. Tables are nested lists (read one cell at a time).
+    """
+
+    def __init__(self, items, min_separation):
+        flat = [f for block in items for f in block]
+        item_of = [i for i, block in enumerate(items) for _ in block]
+        order = sorted(range(len(flat)), key=lambda n: flat[n]["departure"])
+        rank_of = {n: r for r, n in enumerate(order)}
+
+        self.flights = [flat[n] for n in order]
+        self.item_ranks = [[] for _ in items]
+        for n in order:
+            self.item_ranks[item_of[n]].append(rank_of[n])
+
+        def micros(key):
+            return np.array([f[key] for f in self.flights], dtype="datetime64[us]").astype(np.int64)
+
+        self.departure = micros("departure")
+        self.start = micros("start")
+        self.end = micros("end")
+
+        # Departure gaps (minutes) and split gaps (minutes) between every pair of ranks
+        departure_gap = (self.departure[None, :] - self.departure[:, None]) / 1e6 / 60.0
+        gap_minutes = (self.start[None, :] - self.end[:, None]) / 1e6 / 60.0
+        blocks = np.array([f.get("block_id") for f in self.flights], dtype=object)
+        in_block = np.array([f.get("block_id") is not None for f in self.flights])
+        same_block = (blocks[:, None] == blocks[None, :]) & in_block[:, None]
+
+        self.follows = ((departure_gap > min_separation) | same_block).tolist()
+        self.split = ((gap_minutes >= 60) & (gap_minutes <= 300)).tolist()
+        self.gap_minutes = gap_minutes.tolist()
+
+    def shift(self, ranks, split_at):
+        """
+        Shift object of the flights with these ranks (sorted), as build_shift_object
+        would build it; split_at: position of the first flight after the split break (None if none).
+        """
+        flights = self.flights
+        first, last = flights[ranks[0]], flights[ranks[-1]]
+        if split_at is not None:
+            end_1, start_2 = flights[ranks[split_at - 1]]["end"], flights[ranks[split_at]]["start"]
+        else:
+            end_1, start_2 = last["end"], None
+        return {
+            'flights': [flights[r]['flight_id'] for r in ranks],
+            'role': first['role'],
+            'airport': first['airport'],
+            'start': first['start'],
+            'end': last['end'],
+            'duration_hours': None,  # Set by the caller
+            'split': split_at is not None,
+            'start_1': first['start'],
+            'end_1': end_1,
+            'start_2': start_2,
+            'end_2': last['end'] if split_at is not None else None
+        }
+
+
+def extend_shifts_in_order(items, max_duration_hours, min_separation, stats=None, prune=False):
+    """
+    Builds the valid shifts by extending partial shifts with items sorted by departure.
+    A partial shift is only extended while:
+      - its consecutive flights respect min_separation (adding flights never repairs a gap)
+      - some extension can still last max_duration_hours or less, given the shortest
+        pre/post windows of the day and the longest possible split break (5h)
+    Flights, separations and split breaks are looked up in the DayCompatibility of the items.
+    Results are returned in the same order as the exhaustive enumerator (by number of
+    items, then by item position), without the dominated shifts if prune.
+    """
+    if not items:
+        return []
+
+    day = DayCompatibility(items, min_separation)
+    departure, start, end = day.departure.tolist(), day.start.tolist(), day.end.tolist()
+    follows, split, gap_minutes, item_ranks = day.follows, day.split, day.gap_minutes, day.item_ranks
+
+    # Small margin so the bounds never prune a shift kept after rounding duration_hours
+    limit = max_duration_hours + 0.01
+    # Shortest pre/post windows of the day bound the duration of any extension
+    min_pre = float(((day.departure - day.start) / 1e6 / 3600.0).min())
+    min_post = float(((day.end - day.departure) / 1e6 / 3600.0).min())
+    max_split_hours = 5.0
+    max_departure_span = limit + max_split_hours - min_pre - min_post
+
+    # Items sorted by their first departure
+    first_departure = [departure[ranks[0]] for ranks in item_ranks]
+    last_departure = [departure[ranks[-1]] for ranks in item_ranks]
+    order = sorted(range(len(items)), key=lambda i: first_departure[i])
+    # Consecutive flights of each item alone respect min_separation
+    item_ok = [all(follows[a][b] for a, b in zip(ranks, ranks[1:])) for ranks in item_ranks]
+
+    # appending[p]: every item from position p on departs strictly after the items before it,
+    # so extensions only add flights at the end (start and earlier breaks stay fixed)
+    appending = [False] * (len(order) + 1)
+    appending[len(order)] = True
+    prefix_last = [None] * len(order)
+    latest = None
+    for pos, idx in enumerate(order):
+        prefix_last[pos] = latest
+        latest = last_departure[idx] if latest is None else max(latest, last_departure[idx])
+    for pos in range(len(order) - 1, -1, -1):
+        appends = prefix_last[pos] is None or first_departure[order[pos]] > prefix_last[pos]
+        appending[pos] = appends and appending[pos + 1]
+
+    found = []  # (combo positions, shift object)
+    examined = 0
+
+    def extend(chosen, node, last_pos):
+        nonlocal examined
+        # Bounds for shifts that only append flights after the current node
+        tail_bound = None
+        if node is not None:
+            ranks, split_at, pause_hours, span_start, span_end = node
+        if node is not None and min_separation >= 0 and appending[last_pos + 1]:
+            if pause_hours is not None:
+                tail_bound = (start[ranks[0]], pause_hours, False)
+            else:
+                # Best case: a break right after the node, then the shortest possible window
+                split_later = (span_end - start[ranks[0]]) / 1e6 / 3600.0 + min_post + min_post + min_pre
+                tail_bound = (start[ranks[0]], 0.0, split_later > limit)
+
+        for pos in range(last_pos + 1, len(order)):
+            idx = order[pos]
+            if node is None:
+                span_start = first_departure[idx] # First item opens the shift
+            else:
+                # Later items depart even later: nothing further can fit
+                if (first_departure[idx] - span_start) / 1e6 / 3600.0 > max_departure_span:
+                    break
+                if tail_bound is not None:
+                    shift_start, pause, no_later_split = tail_bound
+                    reach = (first_departure[idx] - shift_start) / 1e6 / 3600.0 + min_post - pause
+                    if reach > limit and (pause or no_later_split):
+                        break
+            examined += 1
+            added = item_ranks[idx]
+            if node is None:
+                new_ranks, checked = added, 0
+            elif added[0] > ranks[-1]:
+                # Flights appended after the node: only the new pairs can fail or split
+                new_ranks, checked = ranks + added, len(ranks) - 1
+            else:
+                new_ranks, checked = sorted(ranks + added), 0
+            new_span_end = departure[new_ranks[-1]]
+            if (new_span_end - span_start) / 1e6 / 3600.0 > max_departure_span:
+                continue
+            # Separation failures persist in every extension
+            if checked:
+                if not (item_ok[idx] and follows[ranks[-1]][added[0]]):
+                    continue
+            elif not all(follows[a][b] for a, b in zip(new_ranks, new_ranks[1:])):
+                continue
+            # First split break, as build_shift_object
+            new_split_at = split_at if checked and split_at is not None else None
+            if new_split_at is None:
+                for k in range(checked, len(new_ranks) - 1):
+                    if split[new_ranks[k]][new_ranks[k + 1]]:
+                        new_split_at = k + 1
+                        break
+            total_duration = (end[new_ranks[-1]] - start[new_ranks[0]]) / 1e6 / 3600.0
+            if new_split_at is None:
+                duration_hours = round(total_duration, 2)
+                new_pause = None
+            else:
+                a, b = new_ranks[new_split_at - 1], new_ranks[new_split_at]
+                duration_hours = round(total_duration - gap_minutes[a][b] / 60.0, 2)
+                new_pause = (start[b] - end[a]) / 1e6 / 3600.0
+            if duration_hours <= max_duration_hours:
+                shift_obj = day.shift(new_ranks, new_split_at)
+                shift_obj["duration_hours"] = duration_hours
+                found.append((sorted(chosen + [idx]), shift_obj))
+            extend(chosen + [idx], (new_ranks, new_split_at, new_pause, span_start, new_span_end), pos)
+
+    extend([], None, -1)
+    if stats is not None:
+        stats["combinations"] = stats.get("combinations", 0) + examined
+
+    # Same order as combinations(items, r) for r = 1..N
+    found.sort(key=lambda entry: (len(entry[0]), entry[0]))
+    shifts = [shift_obj for _, shift_obj in found]
+    if prune:
+        kept = prune_dominated_shifts([combo for combo, _ in found], shifts)
+        if stats is not None:
+            stats["pruned"] = stats.get("pruned", 0) + len(shifts) - len(kept)
+        return kept
+    return shifts
+
+
+def prune_dominated_shifts(combos, shifts):
+    """
+    Drops the shifts B for which another shift A, with one more item (flight or cluster
+    block), is at least as good in every respect:
+      - A covers every flight of B
+      - A starts no earlier and ends no later than B (same day)
+      - A is strictly shorter (duration_hours), e.g. the extra flight opens a split break
+    Any worker who can take B can take A (rest, weekly hours and streak only get easier),
+    and A always covers as many pending flights as B, so assign_greedy_workers scores A
+    first and never picks B, and no optimal assignment needs B. Dominance is transitive,
+    so the shifts left are the same greedy plan.
+
+    combos: item positions of each shift (sorted tuples), aligned with shifts.
+    Returns the shifts kept, in order.
+    """
+    combos = [tuple(combo) for combo in combos]
+    position = {combo: i for i, combo in enumerate(combos)}
+    dominated = set()
+    for combo, sh in zip(combos, shifts):
+        if len(combo) < 2:
+            continue
+        for j in range(len(combo)):
+            # B: the same items without one
+            i = position.get(combo[:j] + combo[j + 1:])
+            if i is None:
+                continue
+            other = shifts[i]
+            if (sh["duration_hours"] < other["duration_hours"] and other["start"] <= sh["start"]
+                    and sh["end"] <= other["end"] and sh["start"].date() == other["start"].date()):
+                dominated.add(i)
+    return [sh for i, sh in enumerate(shifts) if i not in dominated]
+
+
+def generate_all_shifts_exhaustive(items, max_duration_hours, min_separation, stats=None):
+    """
+    Original enumerator: tries every combination of 1 to N items (2^N candidates).
+    Kept to cross-check extend_shifts_in_order.
+    """
+    all_valid_shifts = []
     seen_combos = set()
 
     # Try all combinations 1 to N items. items are all flights, both unique and cluster, r indicate how many items are being combined
@@ -78,6 +362,9 @@ def generate_all_shifts_9h_for_role(shifts_same_role, max_duration_hours, min_se
             if shift_obj["duration_hours"] <= max_duration_hours:
                 all_valid_shifts.append(shift_obj)
 
+    if stats is not None:
+        stats["combinations"] = stats.get("combinations", 0) + 2 ** len(items) - 1
+
     # Eliminate duplicates
     unique = {}
     for sh in all_valid_shifts:
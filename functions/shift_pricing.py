@@ -0,0 +1,192 @@
+import numpy as np
+
+from functions.shift_generation import build_shift_object, consecutive_pairs_ok, DayCompatibility
+
+try:
+    import highspy
+except ImportError:  # Optional: only shift pricing needs it
+    highspy = None
+
+# Pricing labels are tuples (first, pause, duals, pending, parent, flight): a path of
+# flights (ranks of a DayCompatibility) ending at flight, with its first flight, its split
+# break in hours (None if no split yet), the sum of its flight duals, the flights of its
+# blocks still to add (frozenset of ranks) and the label it extends (None for the first flight)
+
+
+def price_shifts(items, max_duration_hours, min_separation, max_rounds=100, columns_per_round=50, stats=None):
+    """
+    Shifts of one (role, airport, day) by column generation, instead of every valid
+    combination (generate_all_shifts_9h_for_role).
+
+    Master: cover every flight at least once at the lowest cost, a shift costing its
+    duration plus a weight larger than all the hours of the day (fewer shifts first).
+    Its LP is solved with HiGHS over the shifts found so far, starting from one shift
+    per item and a costlier slack per flight (for flights no item alone can cover); the
+    pricing subproblem then looks for shifts with negative reduced cost (cost minus the
+    duals of their flights) as a resource-constrained shortest path over the flights
+    sorted by departure, with the rules of build_shift_object:
+      - consecutive flights are > min_separation minutes apart, unless they belong to
+        the same indivisible block
+      - a block is taken whole: its first flight commits the path to its other flights,
+        which no later flight may skip (blocks may interleave, e.g. the round-robin
+        blocks of generate_fixed_cluster_shifts)
+      - the first gap of 1 to 5 hours between a flight's end and the next start is the
+        split break and does not count as worked time
+      - the worked time must stay ≤ max_duration_hours
+    Labels with the same first flight and pending block flights are dropped when another
+    one has both a longer break and more duals. Up to columns_per_round shifts are added
+    per round, until none improves or after max_rounds.
+
+    items: as for generate_all_shifts_9h_for_role (single shifts and indivisible blocks).
+    stats: optional dict, gets the labels extended by the pricing ('combinations') and
+    the LP rounds ('pricing_rounds').
+    Returns the generated shifts (built and checked with build_shift_object), in the
+    order they were found.
+    """
+    if highspy is None:
+        raise RuntimeError("Shift pricing needs HiGHS: pip install highspy")
+
+    blocks = []
+    for item in items:
+        flights = item["flights"] if isinstance(item, dict) and item.get("indivisible") else [item]
+        blocks.append(sorted(flights, key=lambda s: s["departure"]))
+    blocks.sort(key=lambda block: block[0]["departure"])
+
+    flight_ids = sorted({f["flight_id"] for block in blocks for f in block})
+    row_of = {fid: r for r, fid in enumerate(flight_ids)}
+    weight = len(flight_ids) * max_duration_hours + 1
+
+    columns = []
+    seen = set()
+
+    def add_column(flights):
+        ordered = sorted(flights, key=lambda s: s["departure"])
+        key = tuple(f["flight_id"] for f in ordered)
+        if key in seen or not consecutive_pairs_ok(ordered, min_separation):
+            return False
+        shift = build_shift_object(ordered)
+        if shift["duration_hours"] > max_duration_hours:
+            return False
+        seen.add(key)
+        columns.append(shift)
+        rows = sorted({row_of[fid] for fid in key})
+        h.addCol(weight + shift["duration_hours"], 0, np.inf, len(rows),
+                 np.array(rows, dtype=np.int32), np.ones(len(rows)))
+        return True
+
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+
+    # Every flight must be covered; a slack column per flight, costing more than any shift
+    # with it, keeps the LP feasible for flights no shift found so far (or at all) can cover
+    h.addRows(len(flight_ids), np.ones(len(flight_ids)), np.full(len(flight_ids), np.inf),
+              0, np.zeros(len(flight_ids), dtype=np.int32), np.array([], dtype=np.int32), np.array([]))
+    for r in range(len(flight_ids)):
+        h.addCol(2 * weight, 0, np.inf, 1, np.array([r], dtype=np.int32), np.ones(1))
+    for block in blocks:
+        add_column(block)
+    if not flight_ids:
+        return columns
+
+    day = DayCompatibility(blocks, min_separation)
+    for _ in range(max_rounds):
+        if stats is not None:
+            stats["pricing_rounds"] = stats.get("pricing_rounds", 0) + 1
+        h.run()
+        duals = h.getSolution().row_dual
+        dual_of = [duals[row_of[f["flight_id"]]] for f in day.flights]
+
+        candidates = price_paths(day, dual_of, weight, max_duration_hours, stats)
+        added = 0
+        for reduced_cost, path in sorted(candidates, key=lambda c: c[0]):
+            if reduced_cost >= -1e-6 or added >= columns_per_round:
+                break
+            added += add_column([day.flights[r] for r in path])
+        if not added:
+            break
+
+    return columns
+
+
+def price_paths(day, dual_of, weight, max_duration_hours, stats=None):
+    """
+    Pricing subproblem: the best complete path (lowest reduced cost) ending at each flight.
+    day: DayCompatibility of the items; dual_of: dual of each flight, by rank.
+    stats: optional dict, 'combinations' is increased by the labels extended.
+    Returns (reduced cost, [ranks of the path]) per flight ending a complete path.
+    """
+    limit = max_duration_hours + 0.005  # duration_hours is rounded to 2 decimals
+    start, end = day.start.tolist(), day.end.tolist()
+    follows, split, gap_minutes = day.follows, day.split, day.gap_minutes
+
+    # First flight of each item → the other flights a path starting it must add
+    opens = {ranks[0]: frozenset(ranks[1:]) for ranks in day.item_ranks}
+
+    labels = [dict() for _ in day.flights]  # flight → {(first flight, pending): [labels]}
+    best = []
+    extended = 0
+
+    def worked_hours(first, pause, last):
+        return (end[last] - start[first]) / 1e6 / 3600.0 - (pause or 0.0)
+
+    def add_label(j, label):
+        first, pause, duals, pending = label[:4]
+        if worked_hours(first, pause, j) > limit:
+            return
+        kept = labels[j].setdefault((first, pending), [])
+        for other in kept:
+            if (other[1] is None) == (pause is None) and (other[1] or 0.0) >= (pause or 0.0) and other[2] >= duals:
+                return
+        kept[:] = [
+            other for other in kept
+            if not ((other[1] is None) == (pause is None) and (pause or 0.0) >= (other[1] or 0.0) and duals >= other[2])
+        ]
+        kept.append(label)
+
+    for j in range(len(day.flights)):
+        # Paths starting here (the first flight of a block starts it whole)
+        if j in opens:
+            extended += 1
+            add_label(j, (j, None, dual_of[j], opens[j], None, j))
+
+        # Paths ending at an earlier flight, extended with this one
+        for i in range(j):
+            if not follows[i][j] or not labels[i]:
+                continue
+            for (first, pending), node_labels in labels[i].items():
+                if pending and min(pending) < j:
+                    continue  # A flight of a started block would be skipped
+                if j in pending:
+                    new_pending = pending - {j}
+                elif j in opens:
+                    new_pending = pending | opens[j]
+                else:
+                    continue  # Later flight of a block not started
+                extended += len(node_labels)
+                for label in node_labels:
+                    pause = label[1]
+                    if pause is None and split[i][j]:
+                        pause = gap_minutes[i][j] / 60.0
+                    add_label(j, (first, pause, label[2] + dual_of[j], new_pending, label, j))
+
+        # Best complete path ending at this flight
+        best_label = None
+        best_cost = None
+        for (first, pending), node_labels in labels[j].items():
+            if pending:
+                continue
+            for label in node_labels:
+                cost = weight + worked_hours(first, label[1], j) - label[2]
+                if best_cost is None or cost < best_cost:
+                    best_label, best_cost = label, cost
+        if best_label is not None:
+            path = []
+            label = best_label
+            while label is not None:
+                path.append(label[5])
+                label = label[4]
+            best.append((best_cost, path[::-1]))
+
+    if stats is not None:
+        stats["combinations"] = stats.get("combinations", 0) + extended
+    return best
@@ -0,0 +1,315 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from functions.shift_generation import generate_all_shifts_9h_for_role
+from functions.shift_pricing import price_shifts
+
+try:
+    import highspy
+except ImportError:  # Optional: only the MILP solver needs it
+    highspy = None
+
+HOUR = timedelta(hours=1)
+
+
+class GreedySolver:
+    """
+    Default solver: every valid shift not dominated by another (see prune_dominated_shifts),
+    and the assignments of assign_greedy_workers as they are.
+
+    A solver provides the candidate shifts of each (role, airport, day) and re-assigns
+    the shifts of one partition (airport and role prefix, all days) after the greedy pass:
+      - generate_shifts(inputs_for_generation, params, stats=None): shifts of one unit, from
+        its cluster blocks and single shifts (see cluster_day_inputs); stats as for
+        generate_all_shifts_9h_for_role
+      - solve(units, airport, prefix, params) receives the units of plan_partition
+        ({(role, airport): [(day, digest, shifts, assignments, not_covered)]}) and returns
+        (units, report), the units with their assignments replaced and a dict describing
+        the solve
+    prices_shifts: generate_shifts does not return every valid shift (not cached).
+    Solvers are pickled to planner processes.
+    """
+    name = "greedy"
+    prices_shifts = False
+
+    def generate_shifts(self, inputs_for_generation, params, stats=None):
+        return generate_all_shifts_9h_for_role(
+            inputs_for_generation,
+            max_duration_hours=params["max_shift_duration"],
+            min_separation=params["cluster_gap_minutes"],
+            stats=stats,
+            prune=True
+        )
+
+    def solve(self, units, airport, prefix, params):
+        return units, None
+
+
+class MilpSolver(GreedySolver):
+    """
+    Exact shift selection and worker assignment of a partition as an integer program,
+    solved with HiGHS (optional dependency, pip install highspy).
+
+    Over the shifts generated for every day of the partition, with x[w, s] = worker w
+    takes shift s and y[w] = worker w is used:
+      - every flight covered by some shift is covered at least once
+      - one shift per worker and day, and only for used workers
+      - ≥ min_rest_hours_between_shifts between the shifts of a worker (big-M rows
+        per pair of days, compact enough for thousands of shifts a day)
+      - ≤ max_weekly_hours per natural week
+      - ≤ max_consecutive_days worked in any run of consecutive days
+    It minimizes the workers, then the assigned hours (a worker weighs more than all
+    the hours the candidate workers can work). The candidate workers are the greedy
+    ones, so the greedy assignment is a feasible warm start and an upper bound.
+
+    time_limit: seconds per partition; mip_gap: relative gap at which HiGHS stops.
+    If no better solution is found in time the greedy assignments are kept.
+    """
+    name = "milp"
+
+    def __init__(self, time_limit=60, mip_gap=0.0, verbose=False):
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.verbose = verbose
+
+    def solve(self, units, airport, prefix, params):
+        if highspy is None:
+            raise RuntimeError("The MILP solver needs HiGHS: pip install highspy")
+
+        # (role, flight) pairs to cover (those the greedy pass covered, i.e. every flight
+        # some shift covers) and the shifts covering at least one, with their unit
+        scope = set()
+        shifts = []
+        unit_of = {}
+        for (role, _), day_results in units.items():
+            for day, digest, day_shifts, assignments, not_covered in day_results:
+                covered = {fid for a in assignments for fid in a["shift"]["flights"]}
+                scope |= {(role, fid) for fid in covered}
+                for sh in day_shifts:
+                    if covered.intersection(sh["flights"]):
+                        unit_of[id(sh)] = (role, day)
+                        shifts.append(sh)
+        greedy = [a for day_results in units.values() for unit in day_results for a in unit[3]]
+        greedy_workers = sorted({a["worker_id"] for a in greedy}, key=lambda wid: worker_number(wid, airport, prefix))
+
+        report = {
+            "airport": airport, "prefix": prefix, "solver": self.name, "status": "greedy",
+            "greedy_workers": len(greedy_workers), "workers": len(greedy_workers),
+            "greedy_hours": round(sum(a["shift"]["duration_hours"] for a in greedy), 2), "hours": None,
+            "objective": None, "bound": None, "gap": None,
+        }
+        report["hours"] = report["greedy_hours"]
+        if not greedy_workers:
+            return units, report
+
+        model = PartitionModel(shifts, scope, len(greedy_workers), params)
+        index = {id(sh): i for i, sh in enumerate(shifts)}
+        warm = [(greedy_workers.index(a["worker_id"]), index[id(a["shift"])]) for a in greedy]
+
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", bool(self.verbose))
+        h.setOptionValue("time_limit", float(self.time_limit))
+        h.setOptionValue("mip_rel_gap", float(self.mip_gap))
+        model.load(h)
+        model.warm_start(h, warm)
+        h.run()
+
+        info = h.getInfo()
+        report["status"] = h.modelStatusToString(h.getModelStatus())
+        if info.primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+            return units, report
+        report["objective"] = info.objective_function_value
+        report["bound"] = info.mip_dual_bound
+        report["gap"] = info.mip_gap
+
+        solution = model.assignments(h.getSolution().col_value)
+        if model.cost(solution) >= model.cost(warm):
+            return units, report
+
+        # Worker IDs numbered by first shift, like the greedy ones
+        first_shift = {}
+        for w, i in sorted(solution, key=lambda wi: (shifts[wi[1]]["start"], wi[1])):
+            first_shift.setdefault(w, len(first_shift) + 1)
+        new_assignments = defaultdict(list)
+        for w, i in sorted(solution, key=lambda wi: (shifts[wi[1]]["start"], first_shift[wi[0]])):
+            sh = shifts[i]
+            new_assignments[unit_of[id(sh)]].append(
+                {"worker_id": f"{airport}-{prefix}{first_shift[w]}", "shift": sh}
+            )
+
+        report["workers"] = len(first_shift)
+        report["hours"] = round(sum(shifts[i]["duration_hours"] for _, i in solution), 2)
+        units = {
+            key: [
+                (day, digest, day_shifts, new_assignments.get((key[0], day), []), not_covered)
+                for day, digest, day_shifts, assignments, not_covered in day_results
+            ]
+            for key, day_results in units.items()
+        }
+        return units, report
+
+
+class ColumnGenerationSolver(MilpSolver):
+    """
+    MilpSolver over priced shifts: each unit only gets the shifts found by column
+    generation on its covering problem (see price_shifts) instead of every valid
+    combination, so large hub days never hold all candidate shifts. The greedy pass
+    and the MILP then work on those shifts.
+
+    max_rounds / columns_per_round: limits of the pricing loop of each unit.
+    """
+    name = "colgen"
+    prices_shifts = True
+
+    def __init__(self, time_limit=60, mip_gap=0.0, verbose=False, max_rounds=100, columns_per_round=50):
+        super().__init__(time_limit, mip_gap, verbose)
+        self.max_rounds = max_rounds
+        self.columns_per_round = columns_per_round
+
+    def generate_shifts(self, inputs_for_generation, params, stats=None):
+        return price_shifts(
+            inputs_for_generation,
+            max_duration_hours=params["max_shift_duration"],
+            min_separation=params["cluster_gap_minutes"],
+            max_rounds=self.max_rounds,
+            columns_per_round=self.columns_per_round,
+            stats=stats
+        )
+
+
+class PartitionModel:
+    """
+    Columns and rows of the MilpSolver program for the given shifts, (role, flight) pairs
+    to cover and number of candidate workers.
+    Columns: x[w, s] (w * len(shifts) + s), then y[w].
+    """
+
+    def __init__(self, shifts, scope, workers, params):
+        self.shifts = shifts
+        self.workers = workers
+        n = len(shifts)
+        days = sorted({sh["start"].date() for sh in shifts})
+        by_day = defaultdict(list)
+        by_week = defaultdict(list)
+        for i, sh in enumerate(shifts):
+            by_day[sh["start"].date()].append(i)
+            by_week[sh["start"].date().isocalendar()[:2]].append(i)
+
+        # A worker weighs more than all the hours the candidate workers can work
+        max_hours = workers * sum(max(shifts[i]["duration_hours"] for i in by_day[d]) for d in days)
+        self.worker_cost = max_hours + 1
+        self.costs = [sh["duration_hours"] for sh in shifts] * workers + [self.worker_cost] * workers
+
+        rows = []  # (lower, upper, [(column, coefficient)])
+
+        # Coverage
+        by_flight = defaultdict(list)
+        for i, sh in enumerate(shifts):
+            for fid in sh["flights"]:
+                if (sh["role"], fid) in scope:
+                    by_flight[(sh["role"], fid)].append(i)
+        for key in sorted(by_flight):
+            rows.append((1, np.inf, [(w * n + i, 1) for w in range(workers) for i in by_flight[key]]))
+
+        # Rest between the shifts of two days d < d2 that can conflict, one row per pair:
+        # start(d2) - end(d) ≥ rest if the worker works both days (times in hours from the
+        # midnight of d; with one shift per day, the x of a day select its start/end)
+        rest = params["min_rest_hours_between_shifts"]
+        rest_rows = []
+        for k, d in enumerate(days):
+            midnight = datetime.combine(d, datetime.min.time())
+            ends = {i: (shifts[i]["end"] - midnight) / HOUR for i in by_day[d]}
+            latest = max(ends.values())
+            big = rest + latest
+            for d2 in days[k + 1:]:
+                starts = {j: (shifts[j]["start"] - midnight) / HOUR for j in by_day[d2]}
+                if min(starts.values()) >= latest + rest:
+                    break
+                rest_rows.append((rest - 2 * big, [(i, -end - big) for i, end in ends.items()] +
+                                  [(j, start - big) for j, start in starts.items()]))
+
+        # Consecutive days: any max_consecutive_days + 1 calendar days in a row
+        window = params["max_consecutive_days"] + 1
+        runs = []
+        for d in days:
+            run = [j for k in range(window) for j in by_day.get(d + timedelta(days=k), [])]
+            if len({shifts[j]["start"].date() for j in run}) == window:
+                runs.append(run)
+
+        for w in range(workers):
+            x = w * n
+            y = workers * n + w
+            for d in days:
+                rows.append((-np.inf, 0, [(x + i, 1) for i in by_day[d]] + [(y, -1)]))
+            for lower, entries in rest_rows:
+                rows.append((lower, np.inf, [(x + i, v) for i, v in entries]))
+            for week in by_week.values():
+                rows.append((-np.inf, params["max_weekly_hours"], [(x + i, shifts[i]["duration_hours"]) for i in week]))
+            for run in runs:
+                rows.append((-np.inf, params["max_consecutive_days"], [(x + i, 1) for i in run]))
+            if w:
+                rows.append((0, np.inf, [(y - 1, 1), (y, -1)]))  # Use workers in order
+        self.rows = rows
+
+    @property
+    def columns(self):
+        return self.workers * (len(self.shifts) + 1)
+
+    def load(self, h):
+        columns = self.columns
+        h.addVars(columns, np.zeros(columns), np.ones(columns))
+        h.changeColsIntegrality(columns, np.arange(columns, dtype=np.int32),
+                                np.full(columns, highspy.HighsVarType.kInteger, dtype=np.uint8))
+        h.changeColsCost(columns, np.arange(columns, dtype=np.int32), np.array(self.costs, dtype=np.float64))
+
+        starts = np.cumsum([0] + [len(entries) for _, _, entries in self.rows[:-1]]).astype(np.int32)
+        indices = np.array([c for _, _, entries in self.rows for c, _ in entries], dtype=np.int32)
+        values = np.array([v for _, _, entries in self.rows for _, v in entries], dtype=np.float64)
+        h.addRows(len(self.rows),
+                  np.array([lower for lower, _, _ in self.rows], dtype=np.float64),
+                  np.array([upper for _, upper, _ in self.rows], dtype=np.float64),
+                  len(indices), starts, indices, values)
+
+    def warm_start(self, h, assignments):
+        """
+        Starts from the given (worker, shift) pairs; candidate workers are all used.
+        """
+        n = len(self.shifts)
+        columns = sorted({w * n + i for w, i in assignments} | {self.workers * n + w for w in range(self.workers)})
+        h.setSolution(len(columns), np.array(columns, dtype=np.int32), np.ones(len(columns)))
+
+    def assignments(self, values):
+        """
+        (worker, shift) pairs set in a solution.
+        """
+        n = len(self.shifts)
+        return [(c // n, c % n) for c in range(self.workers * n) if values[c] > 0.5]
+
+    def cost(self, assignments):
+        """
+        Objective of the (worker, shift) pairs.
+        """
+        workers = {w for w, _ in assignments}
+        return len(workers) * self.worker_cost + sum(self.shifts[i]["duration_hours"] for _, i in assignments)
+
+
+def worker_number(worker_id, airport, prefix):
+    """
+    Number of a worker ID like 'BCN-SP12' (12).
+    """
+    number = worker_id[len(f"{airport}-{prefix}"):]
+    return int(number) if number.isdigit() else 0
+
+
+SOLVERS = {"greedy": GreedySolver, "milp": MilpSolver, "colgen": ColumnGenerationSolver}
+
+
+def make_solver(name="greedy", **options):
+    """
+    Solver by name (see SOLVERS); options go to its constructor.
+    """
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{name}', expected one of: {', '.join(SOLVERS)}")
+    return SOLVERS[name](**options)
@@ -0,0 +1,166 @@
+import csv
+import itertools
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from tabulate import tabulate
+
+from functions.shift_generation import partition_single_shifts
+from functions.planner import run_planning, cluster_day_inputs
+from functions.solvers import GreedySolver
+
+SWEEP_METRICS = ("Headcount", "Hours", "Uncovered")
+
+
+def sweep_combinations(base_params, grid):
+    """
+    One params dict per combination of the grid values ({name: [values]}), in grid order;
+    parameters not in the grid keep their base_params value.
+    """
+    names = list(grid)
+    return [dict(base_params, **dict(zip(names, values))) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def run_sweep(flights, roles, base_params, grid, workers=1, solver=None):
+    """
+    Plans every combination of the parameter grid and returns its metrics by role and airport.
+
+    Work that does not depend on a swept parameter is done once:
+      - flight objects and the single-shift partition: once for all runs
+      - cluster detection: once per cluster_gap_minutes
+      - shift generation: once per (cluster_gap_minutes, max_shift_duration)
+      - greedy assignment: once per combination
+    Clustering, generation and assignment jobs run in a process pool (workers > 1).
+    Each run is the same plan as run_planning with its params (and solver, if given).
+
+    Returns a list of (params, rows), rows being dicts with Role, Airport, Headcount
+    (distinct workers), Hours (assigned) and Uncovered (flights not covered).
+    """
+    combinations = sweep_combinations(base_params, grid)
+    buckets = partition_single_shifts(flights)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # Clusters by gap (on copies: clustering adds 'block_id' to the single shifts)
+        gaps = sorted({p["cluster_gap_minutes"] for p in combinations})
+        cluster_inputs = dict(zip(gaps, _map(executor, _cluster_units, [(buckets, roles, gap) for gap in gaps])))
+
+        # Generated shifts by (gap, max duration)
+        generation_keys = sorted({(p["cluster_gap_minutes"], p["max_shift_duration"]) for p in combinations})
+        day_shifts = dict(zip(generation_keys, _map(executor, _generate_units, [
+            (cluster_inputs[gap], dict(base_params, max_shift_duration=duration, cluster_gap_minutes=gap), solver)
+            for gap, duration in generation_keys
+        ])))
+
+        # One assignment run per combination
+        rows = _map(executor, _sweep_run, [
+            (buckets, roles, p, day_shifts[(p["cluster_gap_minutes"], p["max_shift_duration"])], solver)
+            for p in combinations
+        ])
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return list(zip(combinations, rows))
+
+
+def _map(executor, function, jobs):
+    """
+    function(*job) for each job, in the process pool if any; results in job order.
+    """
+    if executor is None:
+        return [function(*job) for job in jobs]
+    return [future.result() for future in [executor.submit(function, *job) for job in jobs]]
+
+
+def _cluster_units(buckets, roles, cluster_gap_minutes):
+    """
+    Generation inputs (see cluster_day_inputs) of every (role, airport, day) unit for one gap.
+    """
+    return {
+        (role, airport, day): cluster_day_inputs([dict(s) for s in bucket], role, cluster_gap_minutes)
+        for (role, airport, day), bucket in buckets.items()
+        if role in roles and bucket
+    }
+
+
+def _generate_units(unit_inputs, params, solver=None):
+    """
+    Shifts of every unit for the max_shift_duration and cluster_gap_minutes of params,
+    generated by the solver (every valid shift by default).
+    """
+    solver = solver or GreedySolver()
+    return {unit: solver.generate_shifts(inputs_for_generation, params) for unit, inputs_for_generation in unit_inputs.items()}
+
+
+def _sweep_run(buckets, roles, params, day_shifts, solver=None):
+    """
+    Plans one combination with its shifts already generated and returns its metric rows.
+    """
+    uncovered = defaultdict(int)
+
+    def count_uncovered(role, airport, day, shifts, not_covered):
+        uncovered[(role, airport)] += len(not_covered)
+
+    plan = run_planning(None, roles, params, on_unit=count_uncovered, buckets=buckets, day_shifts=day_shifts,
+                        solver=solver)
+
+    workers = defaultdict(set)
+    hours = defaultdict(float)
+    for a in plan["all_assignments"]:
+        sh = a["shift"]
+        workers[(sh["role"], sh["airport"])].add(a["worker_id"])
+        hours[(sh["role"], sh["airport"])] += sh["duration_hours"]
+
+    keys = sorted(set(uncovered) | set(workers), key=lambda k: (roles.index(k[0]), k[1]))
+    return [
+        {
+            "Role": role,
+            "Airport": airport,
+            "Headcount": len(workers[(role, airport)]),
+            "Hours": round(hours[(role, airport)], 2),
+            "Uncovered": uncovered[(role, airport)],
+        }
+        for role, airport in keys
+    ]
+
+
+def print_sweep_matrix(results, grid):
+    """
+    Prints one table per metric: a row per role and airport, a column per combination
+    (labelled with its swept values).
+    """
+    labels = ["\n".join(f"{name}={params[name]}" for name in grid) for params, _ in results]
+    keys = []
+    values = {}
+    for label, (_, rows) in zip(labels, results):
+        for row in rows:
+            key = (row["Role"], row["Airport"])
+            if key not in values:
+                keys.append(key)
+                values[key] = {}
+            values[key][label] = row
+
+    for metric in SWEEP_METRICS:
+        print(f"\n=== {metric} ===")
+        table = [
+            [role, airport] + [values[(role, airport)][label][metric] if label in values[(role, airport)] else 0
+                               for label in labels]
+            for role, airport in keys
+        ]
+        print(tabulate(table, headers=["Role", "Airport"] + labels, tablefmt="fancy_grid", stralign="center"))
+
+
+def export_sweep_csv(results, grid, output_path):
+    """
+    Writes the sweep metrics as CSV, one line per combination, role and airport.
+    """
+    names = list(grid)
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(names + ["Role", "Airport", *SWEEP_METRICS])
+        for params, rows in results:
+            for row in rows:
+                writer.writerow([params[n] for n in names] + [row["Role"], row["Airport"]] + [row[m] for m in SWEEP_METRICS])
+    print(f"Sweep exported to: {output_path}")
+    return output_path
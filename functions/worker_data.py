@@ -1,6 +1,8 @@
 import pandas as pd
 
-def load_worker_shift_rules(file_path):
+from functions.excel_cache import read_excel_cached
+
+def load_worker_shift_rules(file_path, use_cache=True):
     """
     Loads an Excel file containing pre/post time rules by role and operation type.
     
@@ -13,26 +15,37 @@ def load_worker_shift_rules(file_path):
         },
         ...
     }
+    With use_cache, the cleaned table is kept in a typed Arrow snapshot next to the workbook.
     """
     # read excel file
-    df = pd.read_excel(file_path)
-    # Clean columns
-    df.columns = [col.strip() for col in df.columns]
-    # Rename
-    df = df.rename(columns={df.columns[0]: 'Role', df.columns[1]: 'Operation Type', df.columns[2]: 'Pre', df.columns[3]: 'Post'})
-    df = df.dropna(subset=['Role', 'Operation Type', 'Pre', 'Post']) # Elimina columnas onde falte alguno de los campos
+    if use_cache:
+        df = read_excel_cached(file_path, clean_worker_rules, "rules")
+    else:
+        df = clean_worker_rules(pd.read_excel(file_path))
 
     # Iterate through rows
     rules = {}
-    for _, row in df.iterrows():
-        role = row['Role'].strip().upper()
-        op_type = row['Operation Type'].strip().upper()
-        pre = int(row['Pre'])
-        post = int(row['Post'])
-
+    for role, op_type, pre, post in zip(df['Role'], df['Operation Type'], df['Pre'], df['Post']):
         if role not in rules:
             rules[role] = {}
         
         # Store values
-        rules[role][op_type] = {'pre': pre, 'post': post}
+        rules[role][op_type] = {'pre': int(pre), 'post': int(post)}
     return rules
+
+
+def clean_worker_rules(df):
+    """
+    Cleans the raw rules sheet: one row per (role, operation type) with integer minutes.
+    """
+    # Clean columns
+    df.columns = [col.strip() for col in df.columns]
+    # Rename
+    df = df.rename(columns={df.columns[0]: 'Role', df.columns[1]: 'Operation Type', df.columns[2]: 'Pre', df.columns[3]: 'Post'})
+    df = df.dropna(subset=['Role', 'Operation Type', 'Pre', 'Post']) # Elimina columnas onde falte alguno de los campos
+
+    df['Role'] = df['Role'].astype(str).str.strip().str.upper()
+    df['Operation Type'] = df['Operation Type'].astype(str).str.strip().str.upper()
+    df['Pre'] = df['Pre'].astype(int)
+    df['Post'] = df['Post'].astype(int)
+    return df[['Role', 'Operation Type', 'Pre', 'Post']]
@@ -0,0 +1,257 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+
+class WorkerRecord:
+    """
+    Tracking state of one worker. Slots keep large pools compact.
+    """
+    __slots__ = ("worker_id", "last_end", "last_day", "streak", "weekly_hours")
+
+    def __init__(self, worker_id, last_end=None, last_day=None, streak=0, weekly_hours=None):
+        self.worker_id = worker_id
+        self.last_end = last_end            # End time of the last shift
+        self.last_day = last_day            # Last day worked (for the streak)
+        self.streak = streak                # Consecutive days worked up to last_day
+        self.weekly_hours = weekly_hours or {}  # (iso_year, iso_week) → hours
+
+
+class WorkerGroup:
+    """
+    Workers of one airport and role prefix (IDs like 'BCN-SP1', 'BCN-SP2', ...).
+    Keeps their IDs sorted (string order, as the original sorted(existing_workers)) over
+    a min-tree of the end of their last shift, so the lowest ID among the workers rested
+    for a shift is found in O(log n) without looking at the others.
+    """
+    __slots__ = ("id_prefix", "records", "ids", "tree", "size", "next_number")
+
+    def __init__(self, id_prefix):
+        self.id_prefix = id_prefix  # e.g. 'BCN-SP'
+        self.records = {}           # worker ID → WorkerRecord
+        self.ids = []               # Worker IDs, sorted
+        self.tree = [datetime.max, datetime.max]  # Min-tree of last shift ends (datetime.min if none yet) by ID position
+        self.size = 1               # Leaves of the tree (power of two ≥ len(ids))
+        self.next_number = 1        # Number of the next new worker ID
+
+    def index(self, record):
+        """
+        Adds a new worker; the tree is rebuilt, as later IDs shift one position.
+        """
+        insort(self.ids, record.worker_id)
+        self.build()
+
+    def build(self):
+        """
+        Builds the tree from the records of the sorted IDs.
+        """
+        size = 1
+        while size < len(self.ids):
+            size *= 2
+        tree = [datetime.max] * (2 * size)
+        for pos, wid in enumerate(self.ids):
+            tree[size + pos] = self.records[wid].last_end or datetime.min
+        for node in range(size - 1, 0, -1):
+            tree[node] = min(tree[2 * node], tree[2 * node + 1])
+        self.tree, self.size = tree, size
+
+    def update(self, record):
+        """
+        Updates the tree after the last shift end of a worker changed.
+        """
+        tree = self.tree
+        node = self.size + bisect_left(self.ids, record.worker_id)
+        tree[node] = record.last_end or datetime.min
+        node //= 2
+        while node:
+            tree[node] = min(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def first_rested(self, cutoff, lo=0):
+        """
+        Lowest ID position ≥ lo whose last shift ended at cutoff or before, None if none.
+        """
+        tree, size = self.tree, self.size
+        if lo >= size:
+            return None
+        # Walk up from leaf lo to the first subtree to its right holding such a worker
+        node = size + lo
+        while tree[node] > cutoff:
+            # Climb while node is a right child (its right siblings were already passed)
+            while node % 2:
+                node //= 2
+                if node == 0:
+                    return None
+            node += 1
+        # Descend to its leftmost leaf with an end ≤ cutoff
+        while node < size:
+            node = 2 * node if tree[2 * node] <= cutoff else 2 * node + 1
+        return node - size
+
+    def rested_ids(self, cutoff):
+        """
+        Yields, lowest first, the IDs of the workers whose last shift ended at cutoff or before.
+        """
+        pos = self.first_rested(cutoff)
+        while pos is not None:
+            yield self.ids[pos]
+            pos = self.first_rested(cutoff, pos + 1)
+
+
+class WorkerPool:
+    """
+    Indexed view of the worker tracking structures used by assign_greedy_workers.
+    Workers are grouped by (airport, role prefix) and indexed by ID and last shift end,
+    so eligibility checks only look at rested workers of the right group and new IDs
+    come from a counter instead of re-parsing every ID.
+    The given structures (existing_workers, hour_counter, last_shift_end_time,
+    streak_tracker) are kept up to date; once the pool is created, workers should
+    only be added through it.
+    """
+
+    def __init__(self, existing_workers=None, hour_counter=None, last_shift_end_time=None, streak_tracker=None):
+        # Initialize persistent structures if not provided
+        self.existing_workers = existing_workers if existing_workers is not None else set()
+        self.hour_counter = hour_counter if hour_counter is not None else defaultdict(float)
+        self.last_shift_end_time = last_shift_end_time if last_shift_end_time is not None else {}
+        self.streak_tracker = streak_tracker if streak_tracker is not None else {}
+        self.groups = {}  # (airport, role prefix) → WorkerGroup
+        self.eligibility_checks = 0  # eligible_workers calls
+        self.workers_scanned = 0     # Rested workers they looked at
+
+    def group(self, apt, prefix):
+        """
+        Returns the group of (apt, prefix), loading workers already in the tracking structures.
+        """
+        key = (apt, prefix)
+        if key in self.groups:
+            return self.groups[key]
+
+        group = WorkerGroup(f"{apt}-{prefix}")
+        for wid in self.existing_workers:
+            if not wid.startswith(group.id_prefix):
+                continue
+            last_day, streak = self.streak_tracker.get(wid, (None, 0))
+            record = WorkerRecord(wid, self.last_shift_end_time.get(wid), last_day, streak)
+            group.records[wid] = record
+            number = wid[len(group.id_prefix):]
+            if number.isdigit():
+                group.next_number = max(group.next_number, int(number) + 1)
+        group.ids = sorted(group.records)
+        group.build()
+        for (wid, iso_year, iso_week), hours in self.hour_counter.items():
+            if wid in group.records:
+                group.records[wid].weekly_hours[(iso_year, iso_week)] = hours
+
+        self.groups[key] = group
+        return group
+
+    def worker_count(self, apt, prefix):
+        """
+        Number of workers of the group.
+        """
+        return len(self.group(apt, prefix).records)
+
+    def eligible_workers(self, apt, prefix, start, duration_hours, busy,
+                         max_weekly_hours, min_rest_hours_between_shifts, max_consecutive_days):
+        """
+        Yields (worker_id, new_streak), lowest worker ID first, for every worker of the
+        group who can take a shift starting at start:
+            • not in busy (already working that day)
+            • ≤ max_weekly_hours in the natural week including this shift
+            • ≥ min_rest_hours_between_shifts since the last shift
+            • ≤ max_consecutive_days worked in a row
+        Rested workers are taken from the tree in ID order, so the first one costs
+        O(log n) plus O(log n) per rested worker skipped for the other constraints.
+        """
+        group = self.group(apt, prefix)
+        iso_year, iso_week, _ = start.date().isocalendar()
+
+        # Rested workers: last shift ended at least min_rest_hours_between_shifts before start
+        cutoff = start - timedelta(hours=min_rest_hours_between_shifts)
+        self.eligibility_checks += 1
+        for wid in group.rested_ids(cutoff):
+            self.workers_scanned += 1
+            if wid in busy:
+                continue
+            record = group.records[wid]
+            # Weekly hours constraint
+            if record.weekly_hours.get((iso_year, iso_week), 0.0) + duration_hours > max_weekly_hours:
+                continue
+            # Max consecutive work days
+            new_streak = next_streak(record, start.date())
+            if new_streak > max_consecutive_days:
+                continue
+            yield wid, new_streak
+
+    def new_worker(self, apt, prefix):
+        """
+        Creates the next worker ID of the group, like 'BCN-SP1', 'BCN-SP2', ...
+        """
+        group = self.group(apt, prefix)
+        wid = f"{group.id_prefix}{group.next_number}"
+        group.next_number += 1
+
+        record = WorkerRecord(wid)
+        group.records[wid] = record
+        group.index(record)
+        self.existing_workers.add(wid)
+        return wid
+
+    def replay_shift(self, apt, prefix, wid, start, end, duration_hours):
+        """
+        Registers a shift already assigned to wid (e.g. in a saved plan), creating the
+        worker if needed. Replaying a plan's assignments in order rebuilds its state.
+        """
+        group = self.group(apt, prefix)
+        if wid not in group.records:
+            record = WorkerRecord(wid)
+            group.records[wid] = record
+            group.index(record)
+            self.existing_workers.add(wid)
+            number = wid[len(group.id_prefix):]
+            if number.isdigit():
+                group.next_number = max(group.next_number, int(number) + 1)
+        streak = next_streak(group.records[wid], start.date())
+        self.record_shift(apt, prefix, wid, start, end, duration_hours, streak)
+
+    def group_state(self, apt, prefix):
+        """
+        Everything later assignments of the group depend on: next worker number and, per
+        worker, last shift end, streak and weekly hours. Equal states give equal assignments.
+        """
+        group = self.group(apt, prefix)
+        return group.next_number, {
+            wid: (record.last_end, record.last_day, record.streak, record.weekly_hours)
+            for wid, record in group.records.items()
+        }
+
+    def record_shift(self, apt, prefix, wid, start, end, duration_hours, streak):
+        """
+        Registers a shift for a worker and updates the tracking structures.
+        """
+        group = self.group(apt, prefix)
+        record = group.records[wid]
+        iso_year, iso_week, _ = start.date().isocalendar()
+
+        record.last_end = end
+        record.last_day = start.date()
+        record.streak = streak
+        record.weekly_hours[(iso_year, iso_week)] = record.weekly_hours.get((iso_year, iso_week), 0.0) + duration_hours
+        group.update(record)
+
+        self.streak_tracker[wid] = (start.date(), streak)
+        self.hour_counter[(wid, iso_year, iso_week)] = self.hour_counter.get((wid, iso_year, iso_week), 0.0) + duration_hours
+        self.last_shift_end_time[wid] = end
+
+
+def next_streak(record, day):
+    """
+    Consecutive days the worker will have worked after a shift on day.
+    """
+    last_day = record.last_day
+    return (
+        record.streak + 1
+        if last_day and day == last_day + timedelta(days=1)
+        else (record.streak if last_day and day == last_day else 1)
+    )
@@ -0,0 +1,87 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from functions.assignment import assign_greedy_workers, worker_prefix
+from functions.shift_generation import generate_all_shifts_9h_for_role
+from functions.worker_pool import WorkerPool
+
+LIMITS = dict(max_weekly_hours=12, min_rest_hours_between_shifts=12, max_consecutive_days=2)
+
+
+def day_singles(rng, day, n):
+    """
+    Single shifts of one day, all with the same presence window and departures on a
+    15 minute grid, so many shifts tie in coverage and duration.
+    """
+    singles = []
+    for i in range(n):
+        departure = day + timedelta(minutes=15 * rng.randint(0, 40))
+        singles.append({
+            "flight_id": f"{day:%d}F{i}",
+            "role": "SPV PAX",
+            "airport": "BCN",
+            "start": departure - timedelta(minutes=60),
+            "end": departure + timedelta(minutes=15),
+            "departure": departure,
+        })
+    return singles
+
+
+def linear_greedy(shifts, worker_pool, coverage_scope):
+    """
+    Greedy selection by a linear scan, min(pool, key=(-coverage, duration)) over the
+    shifts with a compatible worker (all valid shifts if none), as before the heap.
+    """
+    assigned_day = defaultdict(set)
+    all_flights = set(coverage_scope)
+    covered = set()
+    assignments = []
+
+    def eligible(sh):
+        return worker_pool.eligible_workers(
+            sh["airport"], worker_prefix(sh["role"]), sh["start"], sh["duration_hours"],
+            assigned_day[(sh["airport"], sh["role"], sh["start"].date())], **LIMITS
+        )
+
+    while covered != all_flights:
+        pending = all_flights - covered
+        valid_shifts = [sh for sh in shifts if any(fid in pending for fid in sh["flights"])]
+        if not valid_shifts:
+            break
+        compatible = [sh for sh in valid_shifts if next(eligible(sh), None) is not None]
+        pool = compatible if compatible else valid_shifts
+        best = min(pool, key=lambda sh: (-len(set(sh["flights"]) & pending), sh["duration_hours"]))
+
+        prefix = worker_prefix(best["role"])
+        worker_id, streak = next(eligible(best), (None, 1))
+        if worker_id is None:
+            worker_id = worker_pool.new_worker(best["airport"], prefix)
+        assignments.append({"worker_id": worker_id, "shift": best})
+        covered.update(best["flights"])
+        worker_pool.record_shift(best["airport"], prefix, worker_id, best["start"], best["end"],
+                                 best["duration_hours"], streak)
+        assigned_day[(best["airport"], best["role"], best["start"].date())].add(worker_id)
+    return assignments
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_heap_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    heap_pool, linear_pool = WorkerPool(), WorkerPool()
+    ties = 0
+    # Consecutive days, so workers carry rest, weekly hours and streaks over
+    for d in range(5):
+        singles = day_singles(rng, datetime(2025, 4, 7 + d, 6, 0), rng.randint(2, 8))
+        shifts = generate_all_shifts_9h_for_role(singles, 4, 10)
+        scope = {s["flight_id"] for s in singles}
+        keys = [(len(sh["flights"]), sh["duration_hours"]) for sh in shifts]
+        ties += len(keys) - len(set(keys))
+
+        heap, not_covered = assign_greedy_workers(shifts, None, coverage_scope=scope, worker_pool=heap_pool,
+                                                  **LIMITS)
+        assert heap == linear_greedy(shifts, linear_pool, scope)
+        assert not not_covered
+    assert ties
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from functions.builder import build_flight_objects
+from functions.flight_data import load_excel_data
+from functions.plan_store import load_plan, save_plan
+from functions.planner import run_planning
+from functions.worker_data import load_worker_shift_rules
+
+ROOT = Path(__file__).resolve().parent.parent
+PARAMS = dict(max_shift_duration=9, cluster_gap_minutes=20, max_weekly_hours=40,
+              min_rest_hours_between_shifts=12, max_consecutive_days=6)
+
+
+@pytest.fixture(scope="module")
+def numeric_flights():
+    """
+    Flights of Basic_Data.xlsx with integer IDs (a numeric ID column).
+    """
+    df = load_excel_data(ROOT / "Basic_Data.xlsx", use_cache=False)
+    df["ID"] = range(1000, 1000 + len(df))
+    rules = load_worker_shift_rules(ROOT / "Workers_shift.xlsx", use_cache=False)
+    return df, rules
+
+
+def test_numeric_flight_ids_round_trip(numeric_flights, tmp_path):
+    df, rules = numeric_flights
+    flights = build_flight_objects(df, rules)
+    plan = run_planning(flights, list(rules), PARAMS)
+    save_plan(plan, flights, tmp_path / "plan.npz")
+    loaded = load_plan(tmp_path / "plan.npz")
+
+    assert loaded["all_assignments"] == plan["all_assignments"]
+    assert [f["id"] for f in loaded["flights"]] == [f["id"] for f in flights]
+    assert all(isinstance(fid, int) for sh in loaded["all_shifts"] for fid in sh["flights"])
+
+
+def test_incremental_matches_full_with_numeric_ids(numeric_flights, tmp_path):
+    df, rules = numeric_flights
+    roles = list(rules)
+    save_plan(run_planning(build_flight_objects(df, rules), roles, PARAMS), build_flight_objects(df, rules),
+              tmp_path / "plan.npz")
+    previous = load_plan(tmp_path / "plan.npz")
+
+    # Move one flight: its units are re-planned, the others reused
+    changed = df.copy()
+    changed.loc[changed.index[3], "Day"] += pd.Timedelta(minutes=45)
+    full = run_planning(build_flight_objects(changed, rules), roles, PARAMS)
+    incremental = run_planning(build_flight_objects(changed, rules), roles, PARAMS, previous=previous)
+
+    assert incremental["incremental"]["reused"]
+    assert incremental["all_assignments"] == full["all_assignments"]
+    assert incremental["hour_counter"] == full["hour_counter"]
+    assert incremental["units"] == full["units"]
@@ -0,0 +1,104 @@
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import functions.planner
+from functions.builder import build_flight_objects
+from functions.flight_stream import stream_flight_days
+from functions.flight_data import load_excel_data
+from functions.planner import run_planning, run_planning_stream
+from functions.shift_generation import generate_all_shifts_9h_for_role
+from functions.worker_data import load_worker_shift_rules
+
+ROOT = Path(__file__).resolve().parent.parent
+PARAMS = dict(max_shift_duration=9, cluster_gap_minutes=20, max_weekly_hours=40,
+              min_rest_hours_between_shifts=12, max_consecutive_days=6)
+
+
+@pytest.fixture(scope="module")
+def rules():
+    return load_worker_shift_rules(ROOT / "Workers_shift.xlsx", use_cache=False)
+
+
+@pytest.fixture(scope="module", params=["Basic_Data.xlsx", "Basic_Data_cluster.xlsx"])
+def flights(request, rules):
+    return build_flight_objects(load_excel_data(ROOT / request.param, use_cache=False), rules)
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_planner_processes_match_serial_run(flights, rules, workers):
+    serial = run_planning(flights, list(rules), PARAMS)
+    parallel = run_planning(flights, list(rules), PARAMS, workers=workers)
+
+    assert parallel["all_assignments"] == serial["all_assignments"]
+    assert parallel["hour_counter"] == serial["hour_counter"]
+    assert parallel["units"] == serial["units"]
+
+
+
+def spread_flights(seed, days=6):
+    """
+    Flights spread over the day (gaps of hours, so split breaks occur), two roles each.
+    """
+    rng = random.Random(seed)
+    flights = []
+    for d in range(days):
+        for i in range(rng.randint(4, 9)):
+            departure = datetime(2025, 4, 7 + d, 5, 0) + timedelta(minutes=15 * rng.randint(0, 68))
+            workers = {}
+            for role in ("SPV PAX", "AG PAX"):
+                pre, post = rng.choice([(120, 45), (60, 15), (30, 15)])
+                workers[role] = {"start": departure - timedelta(minutes=pre),
+                                 "end": departure + timedelta(minutes=post)}
+            flights.append({"id": f"D{d}F{i}", "airport": rng.choice(["BCN", "MAD"]), "departure": departure,
+                            "operation_type": "DEP", "workers": workers})
+    return flights
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_pruning_keeps_the_plan(seed, monkeypatch):
+    flights = spread_flights(seed)
+    roles = ["SPV PAX", "AG PAX"]
+    params = {**PARAMS, "max_shift_duration": 12}
+    pruned = run_planning(flights, roles, params)
+    assert pruned["pruned_shifts"]
+
+    monkeypatch.setattr(functions.planner, "generate_all_shifts_9h_for_role",
+                        lambda *args, **kwargs: generate_all_shifts_9h_for_role(*args, **{**kwargs, "prune": False}))
+    every = run_planning(flights, roles, params)
+    assert not every["pruned_shifts"]
+
+    assert every["all_assignments"] == pruned["all_assignments"]
+    assert every["hour_counter"] == pruned["hour_counter"]
+
+
+def assignments_by_unit(plan):
+    """
+    Assignments of each (role, airport, day) unit, as (worker ID, flights) pairs.
+    """
+    by_unit = {}
+    position = 0
+    for role, airport, day, _, _, count in plan["units"]:
+        assignments = plan["all_assignments"][position:position + count]
+        by_unit[(role, airport, day)] = [(a["worker_id"], a["shift"]["flights"]) for a in assignments]
+        position += count
+    return by_unit
+
+
+@pytest.mark.parametrize("workbook", ["Basic_Data.xlsx", "Basic_Data_cluster.xlsx"])
+def test_stream_matches_batch(workbook, rules, tmp_path):
+    schedule = pd.read_excel(ROOT / workbook)
+    roles = list(rules)
+    batch = run_planning(build_flight_objects(load_excel_data(ROOT / workbook, use_cache=False), rules), roles,
+                         PARAMS)
+
+    # The stream needs the rows sorted by airport and day
+    csv_path = tmp_path / "schedule.csv"
+    schedule.sort_values(["Airport", "Day"], kind="stable").to_csv(csv_path, index=False)
+    streamed = run_planning_stream(stream_flight_days(str(csv_path), rules), roles, PARAMS)
+
+    assert assignments_by_unit(streamed) == assignments_by_unit(batch)
+    assert streamed["hour_counter"] == batch["hour_counter"]
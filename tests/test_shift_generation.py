@@ -0,0 +1,119 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from functions.assignment import assign_greedy_workers
+from functions.planner import cluster_day_inputs
+from functions.shift_generation import (
+    extend_shifts_in_order,
+    generate_all_shifts_9h_for_role,
+    generate_all_shifts_exhaustive,
+)
+
+# Pre/post presence windows (minutes) of the different flight types
+WINDOWS = [(135, 45), (120, 40), (105, 30), (100, 30), (60, 15)]
+
+
+def random_singles(rng, n, day=datetime(2025, 4, 1, 5, 0)):
+    """
+    Single shifts of one (role, airport, day): departures on a 5 minute grid (so some
+    are equal), close together or hours apart (so split breaks of 60-300 minutes occur).
+    """
+    singles = []
+    for i in range(n):
+        departure = day + timedelta(minutes=5 * rng.randint(0, 12) * rng.choice([1, 3, 6, 9]))
+        pre, post = rng.choice(WINDOWS)
+        singles.append({
+            "flight_id": f"F{i}",
+            "role": "SPV PAX",
+            "airport": "BCN",
+            "start": departure - timedelta(minutes=pre),
+            "end": departure + timedelta(minutes=post),
+            "departure": departure,
+        })
+    return singles
+
+
+def normalize(inputs):
+    """
+    Items of generate_all_shifts_9h_for_role: flight lists, one per block or single.
+    """
+    return [item["flights"] if isinstance(item, dict) and item.get("indivisible") else [item] for item in inputs]
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_matches_exhaustive(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        singles = random_singles(rng, rng.randint(1, 12))
+        # Cluster blocks in about half of the units
+        cluster_gap = rng.choice([20, 40, 60])
+        inputs = cluster_day_inputs(singles, "SPV PAX" if rng.random() < 0.5 else "CREW", cluster_gap)
+        items = normalize(inputs)
+        max_duration_hours = rng.choice([4, 6, 9, 12])
+        min_separation = rng.choice([-5, 0, 10, 20, 45])
+
+        stats = {}
+        incremental = extend_shifts_in_order(items, max_duration_hours, min_separation, stats)
+        exhaustive = generate_all_shifts_exhaustive(items, max_duration_hours, min_separation)
+        assert incremental == exhaustive
+        assert stats["combinations"] <= 2 ** len(items) - 1
+
+
+def test_split_breaks_match_exhaustive():
+    rng = random.Random(100)
+    splits = 0
+    for _ in range(60):
+        singles = random_singles(rng, rng.randint(2, 10))
+        items = normalize(singles)
+        incremental = extend_shifts_in_order(items, 9, 20)
+        assert incremental == generate_all_shifts_exhaustive(items, 9, 20)
+        splits += sum(sh["split"] for sh in incremental)
+    # The units are spread enough to produce split shifts
+    assert splits
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_duplicate_flight_ids_fall_back_to_exhaustive(seed):
+    rng = random.Random(200 + seed)
+    for _ in range(20):
+        singles = random_singles(rng, rng.randint(3, 9))
+        inputs = cluster_day_inputs(singles, "SPV PAX", 60)
+        # Flights of a block also given as singles
+        inputs += rng.sample(singles, rng.randint(1, 3))
+        max_duration_hours = rng.choice([6, 9])
+        min_separation = rng.choice([0, 20])
+
+        default = generate_all_shifts_9h_for_role(inputs, max_duration_hours, min_separation)
+        exhaustive = generate_all_shifts_9h_for_role(inputs, max_duration_hours, min_separation, exhaustive=True)
+        assert default == exhaustive
+
+
+def test_empty_unit():
+    assert extend_shifts_in_order([], 9, 20) == []
+    assert generate_all_shifts_9h_for_role([], 9, 20) == []
+
+
+def test_pruned_shift_would_tie_on_coverage():
+    day = datetime(2025, 4, 1)
+
+    def single(i, hour, pre, post):
+        departure = day + timedelta(hours=hour)
+        return {"flight_id": f"F{i}", "role": "SPV PAX", "airport": "BCN", "departure": departure,
+                "start": departure - timedelta(minutes=pre), "end": departure + timedelta(minutes=post)}
+
+    # F1 + F3 is 9.25 h without a break; adding F2 opens a split break (8 h worked)
+    singles = [single(1, 8, 120, 45), single(2, 10.5, 30, 15), single(3, 15, 30, 15)]
+    every = generate_all_shifts_9h_for_role(singles, 12, 20)
+    pruned = generate_all_shifts_9h_for_role(singles, 12, 20, prune=True)
+    flights = [sh["flights"] for sh in every]
+    assert flights.index(["F1", "F3"]) < flights.index(["F1", "F2", "F3"])
+    assert ["F1", "F3"] not in [sh["flights"] for sh in pruned]
+
+    # Only F1 and F3 to cover: both shifts cover 2 pending flights and the dominated one
+    # comes first, but the shorter one is assigned with and without pruning
+    for shifts in (every, pruned):
+        assignments, not_covered = assign_greedy_workers(shifts, None, coverage_scope={"F1", "F3"})
+        assert [a["shift"]["flights"] for a in assignments] == [["F1", "F2", "F3"]]
+        assert not not_covered
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from functions.planner import cluster_day_inputs
+from functions.shift_generation import generate_all_shifts_9h_for_role
+from functions.shift_pricing import price_shifts
+
+highspy = pytest.importorskip("highspy")
+
+
+def single(i, departure, pre=120, post=40):
+    return {
+        "flight_id": f"F{i}",
+        "role": "SPV PAX",
+        "airport": "BCN",
+        "start": departure - timedelta(minutes=pre),
+        "end": departure + timedelta(minutes=post),
+        "departure": departure,
+    }
+
+
+def lp_cost(shifts, max_duration_hours):
+    """
+    LP value of the price_shifts master over the given shifts (covering their flights).
+    """
+    flight_ids = sorted({fid for sh in shifts for fid in sh["flights"]})
+    row_of = {fid: r for r, fid in enumerate(flight_ids)}
+    weight = len(flight_ids) * max_duration_hours + 1
+    h = highspy.Highs()
+    h.setOptionValue("output_flag", False)
+    h.addRows(len(flight_ids), np.ones(len(flight_ids)), np.full(len(flight_ids), np.inf),
+              0, np.zeros(len(flight_ids), dtype=np.int32), np.array([], dtype=np.int32), np.array([]))
+    for sh in shifts:
+        rows = sorted({row_of[fid] for fid in sh["flights"]})
+        h.addCol(weight + sh["duration_hours"], 0, np.inf, len(rows),
+                 np.array(rows, dtype=np.int32), np.ones(len(rows)))
+    h.run()
+    return h.getInfo().objective_function_value
+
+
+def test_round_robin_cluster_is_priced():
+    day = datetime(2025, 4, 1, 8, 0)
+    # Flights 15 minutes apart: a cluster split round-robin into interleaved blocks
+    singles = [single(i, day + timedelta(minutes=15 * i)) for i in range(5)]
+    # Later singles, one of them after a split break
+    singles += [single(5, day + timedelta(hours=2), 60, 15), single(6, day + timedelta(hours=3), 100, 30),
+                single(7, day + timedelta(hours=7), 60, 15)]
+    inputs = cluster_day_inputs(singles, "SPV PAX", 60)
+
+    blocks = [[f["departure"] for f in item["flights"]] for item in inputs if isinstance(item, dict)
+              and item.get("indivisible")]
+    # Some block starts between the first and last flights of another one
+    assert any(a[0] < b[0] < a[-1] for a in blocks for b in blocks)
+
+    stats = {}
+    priced = price_shifts(inputs, 9, 20, stats=stats)
+    assert stats["pricing_rounds"] > 1
+
+    every = generate_all_shifts_9h_for_role(inputs, 9, 20)
+    valid = {tuple(sh["flights"]) for sh in every}
+    for sh in priced:
+        assert tuple(sh["flights"]) in valid
+    assert lp_cost(priced, 9) == pytest.approx(lp_cost(every, 9))